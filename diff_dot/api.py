@@ -0,0 +1,187 @@
+"""Diffs as library calls, for running many at once in one process, e.g. from a thread pool.
+
+Every file goes in a directory passed in, nothing depends on or changes the working directory."""
+import asyncio
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from git import Repo
+from networkx.classes import DiGraph
+from rich import print as rprint
+
+from .commit_graphs import CommitGraphCache
+from .diff_render import Renderer, DotStyle, light_mode_style
+from .diff_result import GraphDiff
+from .dot import render_dot_file_async, render_components_async
+from .error import CommandError
+from .fingerprint import changed_nodes, stored_fingerprint
+from .git_utils import worktree_pool, build_inputs_changed
+from .gradle import ProjectDependenciesParser, gradle_split, init_script_command
+from .graph_diff import compare_graph
+from .graph_file import load_graph_from_argument, load_graph_from_deps_lines, load_graph_from_gradle_jsonl
+from .reachability_index import index_path, load_index_for
+
+
+def diff_graphs(older: DiGraph, newer: DiGraph, parent_function=gradle_split, **options) -> GraphDiff:
+    """compare_graph, guided by the graphs' fingerprints when both were stored with them, e.g. by CommitGraphCache.
+
+    Then the diff is empty straight away if the fingerprints match, otherwise only changed nodes are searched.
+    Fingerprints are not computed here, hashing both graphs costs more than the plain diff saves."""
+    older_fingerprint, newer_fingerprint = stored_fingerprint(older), stored_fingerprint(newer)
+    if older_fingerprint is None or newer_fingerprint is None:
+        return compare_graph(older, newer, parent_function, **options)
+    if older_fingerprint.root == newer_fingerprint.root:
+        return GraphDiff()
+    return compare_graph(older, newer, parent_function,
+                         changed_nodes=changed_nodes(older_fingerprint, newer_fingerprint), **options)
+
+
+def diff_files(older_file, newer_file, scratch_dir, *, processes: Optional[int] = None, **options) -> GraphDiff:
+    """Diffs two deps files or gradle dependencies outputs, the latter are converted to deps files in scratch_dir.
+
+    Either can be a directory of dependencies outputs, one per project, parsed with up to processes processes.
+    Uses the reachability index stored next to newer_file if there is one. compare_graph only needs reachability in
+    the newer graph, so an index next to older_file is of no use and is not read."""
+    older = load_graph_from_argument(older_file, os.path.join(scratch_dir, "graph1.deps"), processes=processes)
+    newer = load_graph_from_argument(newer_file, os.path.join(scratch_dir, "graph2.deps"), processes=processes)
+    if os.path.exists(index_path(older_file)):
+        rprint(f"[yellow]Not using the reachability index for [cyan]{older_file}[/cyan], only the newer file's is used")
+    index = load_index_for(newer_file) if os.path.isfile(newer_file) else None
+    if index is None:
+        return diff_graphs(older, newer, **options)
+    rprint(f"[yellow]Using reachability index for [cyan]{newer_file}")
+    with index:
+        return diff_graphs(older, newer, newer_reachability=index, **options)
+
+
+def diff_commits(repo: Repo, commitish1, commitish2, *,
+                 app: str = ":app",
+                 configuration: str = "releaseRuntimeClasspath",
+                 sparse: bool = False,
+                 build_inputs: Optional[Iterable[str]] = None,
+                 worktree_dir=None,
+                 init_script: bool = False,
+                 cache: Optional[CommitGraphCache] = None,
+                 **options) -> GraphDiff:
+    """Diffs the dependencies of app's configuration between two commits, resolved by gradle in pooled worktrees.
+
+    Worktrees are kept in worktree_dir, the temp dir by default, and can be shared by concurrent calls.
+    With init_script, the graph is written by gradle.INIT_SCRIPT rather than parsed from the dependencies report.
+    Raises CommandError if gradle fails."""
+    if not build_inputs_changed(repo, commitish1, commitish2, build_inputs):
+        rprint("[yellow]No build inputs changed")
+        return GraphDiff()
+    older, newer = commit_graphs(repo, [commitish1, commitish2], app=app, configuration=configuration, sparse=sparse,
+                                 worktree_dir=worktree_dir, init_script=init_script, cache=cache)
+    return diff_graphs(older, newer, **options)
+
+
+def commit_graphs(repo: Repo, commitishes, *,
+                  app: str = ":app",
+                  configuration: str = "releaseRuntimeClasspath",
+                  sparse: bool = False,
+                  worktree_dir=None,
+                  init_script: bool = False,
+                  cache: Optional[CommitGraphCache] = None,
+                  parallel: int = 1) -> List[DiGraph]:
+    """Each commit's resolved graph, taken from cache where it has them and stored there once resolved.
+
+    Up to parallel gradle runs happen at once, each in its own worktree."""
+    key = app, configuration, "init_script" if init_script else "dependencies"
+    # rev-parse rather than repo.commit, which shares one git cat-file process between threads
+    hexshas = [repo.git.execute(["git", "rev-parse", f"{commitish}^{{commit}}"]).strip() for commitish in commitishes]
+    graphs = [cache.get(hexsha, *key) if cache else None for hexsha in hexshas]
+    missing = [i for i, graph in enumerate(graphs) if graph is None]
+    if missing:
+        resolved = asyncio.run(gradle_graphs_using_worktrees(repo, [commitishes[i] for i in missing], app,
+                                                             configuration, sparse=sparse, worktree_dir=worktree_dir,
+                                                             init_script=init_script, parallel=parallel))
+        for i, graph in zip(missing, resolved):
+            graphs[i] = graph
+            if cache:
+                cache.put(hexshas[i], *key, graph=graph)
+    return graphs
+
+
+def render_diff(graph_delta: GraphDiff, dot_file, output_images, *,
+                caption: str = "",
+                style: DotStyle = light_mode_style,
+                split_components: bool = False) -> Renderer:
+    """Writes graph_delta to dot_file and renders it to each of output_images.
+
+    With split_components, the parts of the layout are written to a directory next to dot_file.
+    Raises CommandError if Graphviz fails."""
+    dot_file = Path(dot_file)
+    renderer = Renderer(graph_delta, style=style, caption=caption)
+    renderer.gen_delta_dot_file(file=dot_file)
+    for output_image in output_images:
+        os.makedirs(Path(output_image).parent, exist_ok=True)
+    if split_components:
+        asyncio.run(render_components_async(renderer.dot, output_images, dot_file.with_suffix("")))
+    else:
+        asyncio.run(render_all(dot_file, output_images))
+    return renderer
+
+
+async def render_all(input_dot_path, output_images):
+    await asyncio.gather(*[render_dot_file_async(input_dot_path, output_image) for output_image in output_images])
+
+
+async def gradle_graphs_using_worktrees(repo, commitishes, app, configuration, *, sparse: bool = False,
+                                        worktree_dir=None, init_script: bool = False, parallel: int = 1):
+    """Resolves each commit's graph in its own pooled worktree.
+
+    Worktree checkouts run in threads alongside Gradle, Gradle runs up to parallel at a time."""
+    pool = worktree_pool(repo, min(len(commitishes), parallel + 1), directory=worktree_dir)
+    gradle_lock = asyncio.Semaphore(parallel)
+
+    async def graph(commitish):
+        tmp_worktree = await asyncio.to_thread(pool.acquire, commitish, sparse=sparse)
+        try:
+            async with gradle_lock:
+                if init_script:
+                    return await gradle_graph_in_worktree_using_init_script(tmp_worktree, app, configuration)
+                return await gradle_graph_in_worktree(tmp_worktree, app, configuration)
+        finally:
+            pool.release(tmp_worktree)
+
+    return await asyncio.gather(*[graph(commitish) for commitish in commitishes])
+
+
+async def gradle_graph_in_worktree(tmp_worktree, app, configuration):
+    """Runs gradle dependencies, parsing the report while gradle is still writing it"""
+    rprint(f"[yellow]Running gradle dependencies in [cyan]{tmp_worktree}[/cyan]...")
+    command = ["./gradlew", "-q", f"{app}:dependencies", "--configuration", configuration]
+    process = await asyncio.create_subprocess_exec(*command, cwd=tmp_worktree,
+                                                   stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stderr = asyncio.create_task(process.stderr.read())
+    parser = ProjectDependenciesParser()
+    async for line in process.stdout:
+        parser.feed(line.decode())
+    await _check_gradle(process, command, tmp_worktree, stderr)
+    return load_graph_from_deps_lines(parser.output_lines)
+
+
+async def gradle_graph_in_worktree_using_init_script(tmp_worktree, app, configuration):
+    """Runs the init script's gdiffDependencies task, loading the edge list it writes"""
+    rprint(f"[yellow]Running gradle gdiffDependencies in [cyan]{tmp_worktree}[/cyan]...")
+    output_file = Path(tmp_worktree, ".gradle", "gdiff", "graph.jsonl").absolute()
+    output_file.unlink(missing_ok=True)
+    command = init_script_command(app, configuration, output_file)
+    process = await asyncio.create_subprocess_exec(*command, cwd=tmp_worktree,
+                                                   stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+    stderr = asyncio.create_task(process.stderr.read())
+    await _check_gradle(process, command, tmp_worktree, stderr)
+    with open(output_file) as file:
+        return load_graph_from_gradle_jsonl(file)
+
+
+async def _check_gradle(process, command, tmp_worktree, stderr):
+    return_code = await process.wait()
+    if return_code != 0:
+        raise CommandError(
+            f"Command failed ({return_code}) in [cyan]{tmp_worktree}[/cyan] [cyan]{' '.join(command)}[reset]\n"
+            f"{(await stderr).decode()}"
+        )
+    rprint(f"[green]Complete [cyan]{tmp_worktree}")
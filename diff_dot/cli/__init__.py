@@ -1,4 +1,10 @@
 from .commands import commands
+from .bisect import cmd_bisect
 from .diff import cmd_diff
+from .fuzz import cmd_fuzz
 from .git_gradle_diff import cmd_gradle_diff
+from .index import cmd_index
+from .serve import cmd_serve
 from .tests import cmd_tests
+from .timeline import cmd_timeline
+from .why import cmd_why
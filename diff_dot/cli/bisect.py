@@ -0,0 +1,45 @@
+import click
+from git import Repo
+from rich import print as rprint
+
+from .commands import commands
+from ..commit_graphs import CommitGraphCache
+from ..dependencies import Dependency
+from ..error import fail, CommandError
+from ..git_bisect import bisect_edge
+
+
+@commands.command(name="bisect", help="Find the commit where a dependency edge appeared or disappeared")
+@click.argument("repo")
+@click.argument("good")
+@click.argument("bad")
+@click.option("--edge", "-e", required=True, help='The edge to look for, e.g. ":app -> :lib"')
+@click.option("--app", "-a", default=":app")
+@click.option("--configuration", "-c", default="releaseRuntimeClasspath")
+@click.option("--sparse", is_flag=True, default=False,
+              help="Only check out gradle build files, for builds that can resolve dependencies without sources")
+@click.option("build_inputs", "--build-input", multiple=True,
+              help="Glob of files that can change dependencies, only commits changing these are tried. Repeatable, "
+                   "defaults to gradle build files")
+@click.option("--init-script", is_flag=True, default=False,
+              help="Resolve the graph with a bundled gradle init script instead of parsing the dependencies report")
+@click.option("--worktree-dir", default=None, help="Directory for the pooled worktrees, the temp dir by default")
+@click.option("--cache-dir", default=None,
+              help="Directory of cached per-commit graphs, ~/.cache/gdiff/graphs by default")
+def cmd_bisect(repo: str, good: str, bad: str, edge: str, app: str, configuration: str, sparse: bool,
+               build_inputs: tuple[str, ...], init_script: bool, worktree_dir: str, cache_dir: str):
+    names = [name.strip() for name in edge.split("->")]
+    if len(names) != 2 or not all(names):
+        fail(f'Edge must be of the form "a -> b", got [cyan]{edge}')
+    dependency = Dependency(*names)
+    repo = Repo(repo)
+    try:
+        result = bisect_edge(repo, good, bad, dependency, build_inputs=build_inputs, app=app,
+                             configuration=configuration, sparse=sparse, init_script=init_script,
+                             worktree_dir=worktree_dir, cache=CommitGraphCache(cache_dir))
+    except CommandError as e:
+        fail(e)
+    commit = repo.commit(result.hexsha)
+    rprint(f"{dependency.rich_str} {'appears' if result.present else 'disappears'} in [cyan]{result.hexsha[0:11]}"
+           f"[/cyan] {commit.summary}")
+    rprint(f"[yellow]Looked at [cyan]{result.probes}[/cyan] commits")
@@ -6,35 +6,85 @@ import networkx as nx
 from rich import print as rprint
 
 from .commands import commands
-from ..diff_render import Renderer, dark_mode_style, light_mode_style
+from ..api import diff_files, render_diff
+from ..diff_jsonl import save_diff_jsonl
+from ..diff_render import dark_mode_style, light_mode_style
 from ..dot import render_dot_file
+from ..error import fail, CommandError
 from ..gradle import gradle_split
 from ..graph_diff import compare_graph
-from ..graph_file import load_graph_from_argument, ensure_diff_not_empty
+from ..graph_file import load_graph_from_argument, ensure_diff_not_empty, no_differences
+from ..service import request_diff
 
 
-@commands.command(name="diff", help="Diff two deps files or gradle -q dependencies outputs")
+@commands.command(name="diff", help="Diff two deps files or gradle -q dependencies outputs, or directories of "
+                                    "outputs for each project")
 @click.argument("file1")
 @click.argument("file2", default="")
 @click.option("--caption", "-t", default="", help="Caption underneath diagram")
 @click.option("--output", "-o", default=None)
 @click.option("--dark-mode", "-d", is_flag=True, default=False)
-def cmd_diff(file1: str, file2: str, caption: str, output: str, dark_mode: bool):
-    os.makedirs("output", exist_ok=True)
+@click.option("--server", envvar="GDIFF_SERVER", default=None,
+              help="URL of a running serve command to diff with, runs in-process if it does not answer")
+@click.option("--condense", is_flag=True, default=False,
+              help="Find reachability via strongly connected components, faster for large graphs")
+@click.option("--focus", "-f", multiple=True, help="Only diff the neighbourhood of this node, repeatable")
+@click.option("--hops", default=1, help="Size of the --focus neighbourhood, in edges up or downstream")
+@click.option("--split-components", is_flag=True, default=False,
+              help="Lay out each disconnected part of the diff in parallel, for large diffs")
+@click.option("--jsonl", default=None, help="Write the diff as JSON Lines to this file instead of rendering it")
+@click.option("--scratch-dir", default="output", help="Directory for intermediate and default output files")
+@click.option("--processes", "-j", default=None, type=int,
+              help="Processes for parsing dependencies outputs of many projects, one per CPU by default")
+def cmd_diff(file1: str, file2: str, caption: str, output: str, dark_mode: bool, server: str,
+             condense: bool, focus: tuple[str, ...], hops: int, split_components: bool, jsonl: str, scratch_dir: str,
+             processes: int):
+    local_options = [name for name, value in [("--split-components", split_components), ("--condense", condense),
+                                              ("--processes", processes)] if value]
+    if server and local_options:
+        fail(f"{', '.join(local_options)} not supported by the diff service, cannot be used with --server or "
+             f"GDIFF_SERVER")
+    os.makedirs(scratch_dir, exist_ok=True)
+    if server:
+        dot_file_path = Path(scratch_dir, "compare_two_graphs.dot" if file2 else "single_graph.dot")
+        try:
+            response = request_diff({"older": file1 if file2 else None, "newer": file2 or file1,
+                                     "caption": caption, "dark_mode": dark_mode, "focus": list(focus), "hops": hops,
+                                     "format": "jsonl" if jsonl else "dot"}, server=server)
+        except CommandError as e:
+            fail(e)
+        if jsonl:
+            Path(jsonl).write_text(response.get("jsonl", ""))
+            rprint(f"Created [cyan]{jsonl}[/cyan]")
+            return
+        if response["empty"]:
+            no_differences()
+        dot_file_path.write_text(response["dot"])
+        output_png = Path(output) if output else dot_file_path.with_suffix(".png")
+        os.makedirs(output_png.parent, exist_ok=True)
+        try:
+            render_dot_file(dot_file_path, output_png)
+        except CommandError as e:
+            fail(e)
+        rprint(f"Created [cyan]{output_png}[/cyan]")
+        return
+    style = dark_mode_style if dark_mode else light_mode_style
     if file2:
-        g1 = load_graph_from_argument(file1, "output/graph1.deps")
-        g2 = load_graph_from_argument(file2, "output/graph2.deps")
-        g = compare_graph(g1, g2, parent_function=gradle_split)
-        ensure_diff_not_empty(g)
-        dot_file_path = Path("output/compare_two_graphs.dot")
-        Renderer(g, dark_mode=dark_mode, caption=caption).gen_delta_dot_file(file=dot_file_path)
+        g = diff_files(file1, file2, scratch_dir, processes=processes, condense=condense, focus=focus, hops=hops)
+        dot_file_path = Path(scratch_dir, "compare_two_graphs.dot")
     else:
-        g = load_graph_from_argument(file1, "output/single_graph.deps")
-        g = compare_graph(nx.DiGraph(), g, parent_function=gradle_split)
-        dot_file_path = Path("output/single_graph.dot")
-        style = dark_mode_style if dark_mode else light_mode_style
-        Renderer(g, style=style.no_color(), caption=caption).gen_delta_dot_file(file=dot_file_path)
+        g = load_graph_from_argument(file1, os.path.join(scratch_dir, "single_graph.deps"), processes=processes)
+        g = compare_graph(nx.DiGraph(), g, parent_function=gradle_split, condense=condense, focus=focus, hops=hops)
+        dot_file_path = Path(scratch_dir, "single_graph.dot")
+        style = style.no_color()
+    if jsonl:
+        save_diff_jsonl(g, jsonl)
+        rprint(f"Created [cyan]{jsonl}[/cyan]")
+        return
+    ensure_diff_not_empty(g)
     output_png = Path(output) if output else dot_file_path.with_suffix(".png")
-    os.makedirs(output_png.parent, exist_ok=True)
-    render_dot_file(dot_file_path, output_png)
+    try:
+        render_diff(g, dot_file_path, [output_png], caption=caption, style=style, split_components=split_components)
+    except CommandError as e:
+        fail(e)
     rprint(f"Created [cyan]{output_png}[/cyan]")
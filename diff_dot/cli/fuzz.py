@@ -0,0 +1,35 @@
+import os
+
+import click
+from rich import print as rprint
+
+from .commands import commands
+from ..error import fail
+from ..fuzz import ENGINES, fuzz, fixture_text
+
+
+@commands.command(name="fuzz", help="Check compare_graph's alternative engines against it on random graph pairs")
+@click.option("--runs", "-n", default=500, help="Number of random graph pairs")
+@click.option("--seed", "-s", default=0)
+@click.option("--size", default=12, help="Number of nodes in each generated graph")
+@click.option("engines", "--engine", "-e", multiple=True, type=click.Choice(list(ENGINES)),
+              help="Engine to check, repeatable, all by default")
+@click.option("--output-dir", "-o", default="fuzz_failures",
+              help="Directory for the shrunk failing cases, as tests fixtures")
+def cmd_fuzz(runs: int, seed: int, size: int, engines: tuple[str, ...], output_dir: str):
+    report = fuzz(runs, seed=seed, size=size, engines={name: ENGINES[name] for name in engines or ENGINES})
+    reference_time = report.timings["reference"]
+    for name, seconds in report.timings.items():
+        relative = f" ({seconds / reference_time:.2f}x)" if name != "reference" and reference_time else ""
+        rprint(f"[cyan]{name}[/cyan]: {seconds:.3f}s{relative}")
+    if not report.failures:
+        rprint(f"[green]All engines matched on {report.runs} graph pairs")
+        return
+    os.makedirs(output_dir, exist_ok=True)
+    for failure in report.failures:
+        fixture = os.path.join(output_dir, f"fuzz_{failure.engine}_{seed}_{failure.run}_diff.txt")
+        with open(fixture, "w") as file:
+            file.write(fixture_text(failure.before, failure.after))
+        rprint(f"[red]{failure.engine}[/red] differs on run {failure.run} with {failure.options}, shrunk to "
+               f"[cyan]{fixture}")
+    fail(f"{len(report.failures)} engines differ, move their fixtures into tests and run tests --update")
@@ -1,5 +1,4 @@
-import os.path
-import subprocess
+import os
 import tempfile
 from pathlib import Path
 
@@ -7,15 +6,13 @@ import click
 from git import Repo
 from rich import print as rprint
 
-from ..cd import cd
+from ..api import diff_commits, render_diff
 from ..cli.commands import commands
-from ..diff_render import Renderer
-from ..dot import render_dot_file
-from ..error import fail
-from ..git_utils import new_temp_worktree
-from ..gradle import project_dependencies_lines_to_deps, gradle_split
-from ..graph_diff import compare_graph
-from ..graph_file import load_graph_from_deps_lines, ensure_diff_not_empty
+from ..diff_jsonl import save_diff_jsonl
+from ..diff_render import dark_mode_style, light_mode_style
+from ..error import fail, CommandError
+from ..gradle import gradle_split
+from ..graph_file import ensure_diff_not_empty
 
 
 @commands.command(name="git_gradle_diff", help="Diff dependencies across two commits in a gradle repo")
@@ -25,50 +22,79 @@ from ..graph_file import load_graph_from_deps_lines, ensure_diff_not_empty
 @click.option("--app", "-a", default=":app")
 @click.option("--configuration", "-c", default="releaseRuntimeClasspath")
 @click.option("--caption", "-t", default="", help="Caption underneath diagram")
-@click.option("--output", "-o", default=None)
+@click.option("--output", "-o", multiple=True, help="Output image, repeat to render several formats")
 @click.option("--group", "-g", is_flag=True, default=False, help="Group nested modules")
 @click.option("include_shortest_transitive_path", "--shortest-transitive", "-s", is_flag=True, default=False,
               help="Include shortest transitive path")
 @click.option("--dark-mode", "-d", is_flag=True, default=False)
+@click.option("--sparse", is_flag=True, default=False,
+              help="Only check out gradle build files, for builds that can resolve dependencies without sources")
+@click.option("build_inputs", "--build-input", multiple=True,
+              help="Glob of files that can change dependencies, gradle is skipped if none changed. Repeatable, "
+                   "defaults to gradle build files")
+@click.option("--condense", is_flag=True, default=False,
+              help="Find reachability via strongly connected components, faster for large graphs")
+@click.option("--focus", "-f", multiple=True, help="Only diff the neighbourhood of this node, repeatable")
+@click.option("--hops", default=1, help="Size of the --focus neighbourhood, in edges up or downstream")
+@click.option("--split-components", is_flag=True, default=False,
+              help="Lay out each disconnected part of the diff in parallel, for large diffs")
+@click.option("--jsonl", default=None, help="Write the diff as JSON Lines to this file instead of rendering it")
+@click.option("--init-script", is_flag=True, default=False,
+              help="Resolve the graph with a bundled gradle init script instead of parsing the dependencies report")
+@click.option("--worktree-dir", default=None, help="Directory for the pooled worktrees, the temp dir by default")
 def cmd_gradle_diff(repo: str,
                     commitish1: str, commitish2: str,
                     app: str, configuration: str,
                     caption: str,
-                    output: str,
+                    output: tuple[str, ...],
                     dark_mode: bool,
                     include_shortest_transitive_path: bool,
                     group: bool,
+                    sparse: bool,
+                    build_inputs: tuple[str, ...],
+                    condense: bool,
+                    focus: tuple[str, ...],
+                    hops: int,
+                    split_components: bool,
+                    jsonl: str,
+                    worktree_dir: str,
+                    init_script: bool,
                     ):
     repo = Repo(repo)
 
     if caption:
         caption = caption.replace("{old}", commitish1).replace("{new}", commitish2)
 
-    g1 = gradle_graph_using_worktree(repo, "diff_tmp", commitish1, app, configuration)
-    g2 = gradle_graph_using_worktree(repo, "diff_tmp", commitish2, app, configuration)
+    try:
+        g3 = diff_commits(repo, commitish1, commitish2, app=app, configuration=configuration, sparse=sparse,
+                          build_inputs=build_inputs, worktree_dir=worktree_dir, init_script=init_script,
+                          parent_function=gradle_split if group else None,
+                          include_shortest_transitive_path=include_shortest_transitive_path,
+                          condense=condense,
+                          focus=focus,
+                          hops=hops)
+    except CommandError as e:
+        fail(e)
 
-    g3 = compare_graph(g1, g2, parent_function=gradle_split if group else None,
-                       include_shortest_transitive_path=include_shortest_transitive_path)
+    if jsonl:
+        save_diff_jsonl(g3, jsonl)
+        rprint(f"Created [cyan]{jsonl}[/cyan]")
+        return
     ensure_diff_not_empty(g3)
-    output_dot = Path(tempfile.tempdir, "tmp.dot")
-    output_png = Path(output) if output else output_dot.with_suffix(".png")
-    os.makedirs(output_png.parent, exist_ok=True)
-    Renderer(g3, dark_mode=dark_mode, caption=caption).gen_delta_dot_file(file=output_dot)
-    render_dot_file(output_dot, output_png)
-    rprint(f"Created [cyan]{output_png}[/cyan]")
+    output_images = [Path(o) for o in output] or [_default_output_image()]
+    style = dark_mode_style if dark_mode else light_mode_style
+    with tempfile.TemporaryDirectory(prefix="gdiff_") as scratch_dir:
+        try:
+            render_diff(g3, Path(scratch_dir, "diff.dot"), output_images, caption=caption, style=style,
+                        split_components=split_components)
+        except CommandError as e:
+            fail(e)
+    for output_image in output_images:
+        rprint(f"Created [cyan]{output_image}[/cyan]")
 
 
-def gradle_graph_using_worktree(repo, worktree_name, commitish, app, configuration):
-    tmp_worktree = new_temp_worktree(repo, worktree_name, commitish)
-    with cd(tmp_worktree):
-        rprint("[yellow]Running gradle dependencies...", end="")
-        command = ["./gradlew", "-q", f"{app}:dependencies", "--configuration", configuration]
-        result = subprocess.run(command, capture_output=True, text=True, cwd=tmp_worktree)
-        if result.returncode != 0:
-            fail(
-                f"Command failed ({result.returncode}) in [cyan]{tmp_worktree}[/cyan] [cyan]{' '.join(command)}[reset]\n"
-                f"{result.stderr}"
-            )
-        rprint(f"[green]Complete")
-    deps = project_dependencies_lines_to_deps(result.stdout.splitlines())
-    return load_graph_from_deps_lines(deps)
+def _default_output_image() -> Path:
+    """A new file in the temp dir, so concurrent runs without --output do not overwrite each other's image"""
+    descriptor, path = tempfile.mkstemp(prefix="gdiff_", suffix=".png")
+    os.close(descriptor)
+    return Path(path)
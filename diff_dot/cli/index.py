@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import click
+from rich import print as rprint
+
+from .commands import commands
+from ..graph_file import load_graph_from_content
+from ..reachability_index import build_index_for
+
+
+@commands.command(name="index", help="Store a reachability index next to a deps file or gradle dependencies output")
+@click.argument("file")
+def cmd_index(file: str):
+    graph = load_graph_from_content(file, Path(file).read_bytes())
+    index_file = build_index_for(file, graph)
+    rprint(f"Created [cyan]{index_file}[/cyan]")
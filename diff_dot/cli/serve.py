@@ -0,0 +1,20 @@
+import click
+from rich import print as rprint
+
+from .commands import commands
+from ..service import serve, DEFAULT_PORT
+
+
+@commands.command(name="serve", help="Run a local diff service that keeps parsed graphs cached between requests")
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", "-p", default=DEFAULT_PORT)
+@click.option("--cache-size", default=32, help="Number of parsed graphs to keep")
+def cmd_serve(host: str, port: int, cache_size: int):
+    server = serve(host=host, port=port, cache_size=cache_size)
+    rprint(f"[yellow]Serving diffs on [cyan]http://{host}:{port}[/cyan]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -8,7 +8,7 @@ from rich import print as rprint
 from .commands import commands
 from ..diff_render import Renderer
 from ..dot import render_dot_file
-from ..error import fail
+from ..error import fail, CommandError
 from ..gradle import gradle_split
 from ..graph_diff import compare_graph
 from ..graph_file import load_graph_from_deps_lines
@@ -101,6 +101,9 @@ def run_test(file_path: Path, update, indent: int, dark_mode: bool, include_shor
             for extension in [".png", ".svg"]:
                 test_output_image = Path(os.path.join("output", output_path, file_path)).with_suffix(extension)
                 test_output_image.parent.mkdir(parents=True, exist_ok=True)
-                render_dot_file(input_dot_path=expected_test_output_dot, output_image_path=test_output_image)
+                try:
+                    render_dot_file(input_dot_path=expected_test_output_dot, output_image_path=test_output_image)
+                except CommandError as e:
+                    fail(e)
             rprint("[green]Done")
             return True
@@ -0,0 +1,82 @@
+import json
+import os
+from pathlib import Path
+
+import click
+from git import Repo
+from rich import print as rprint
+
+from .commands import commands
+from ..api import render_diff
+from ..commit_graphs import CommitGraphCache
+from ..diff_jsonl import save_diff_jsonl
+from ..diff_render import dark_mode_style, light_mode_style
+from ..error import fail, CommandError
+from ..gradle import gradle_split
+from ..timeline import timeline, timeline_summary
+
+
+@commands.command(name="timeline", help="Diff each consecutive pair of commits in a range, e.g. v1.0..v1.1")
+@click.argument("repo")
+@click.argument("revision_range")
+@click.option("--app", "-a", default=":app")
+@click.option("--configuration", "-c", default="releaseRuntimeClasspath")
+@click.option("--group", "-g", is_flag=True, default=False, help="Group nested modules")
+@click.option("--dark-mode", "-d", is_flag=True, default=False)
+@click.option("--sparse", is_flag=True, default=False,
+              help="Only check out gradle build files, for builds that can resolve dependencies without sources")
+@click.option("build_inputs", "--build-input", multiple=True,
+              help="Glob of files that can change dependencies, commits changing none are skipped. Repeatable, "
+                   "defaults to gradle build files")
+@click.option("--init-script", is_flag=True, default=False,
+              help="Resolve the graph with a bundled gradle init script instead of parsing the dependencies report")
+@click.option("--parallel", "-j", default=2, help="Number of gradle runs at once, each in its own worktree")
+@click.option("--worktree-dir", default=None, help="Directory for the pooled worktrees, the temp dir by default")
+@click.option("--cache-dir", default=None,
+              help="Directory of cached per-commit graphs, ~/.cache/gdiff/graphs by default")
+@click.option("--output-dir", "-o", default="timeline", help="Directory for each step's diff and summary.json")
+@click.option("output_format", "--format", "-f", type=click.Choice(["png", "svg", "jsonl"]), default="png")
+def cmd_timeline(repo: str, revision_range: str, app: str, configuration: str, group: bool, dark_mode: bool,
+                 sparse: bool, build_inputs: tuple[str, ...], init_script: bool, parallel: int, worktree_dir: str,
+                 cache_dir: str, output_dir: str, output_format: str):
+    if ".." not in revision_range:
+        fail(f"Expected a range of commits like [cyan]A..B[/cyan], got [cyan]{revision_range}")
+    start, end = revision_range.split("..", 1)
+    repo = Repo(repo)
+    try:
+        steps = timeline(repo, start, end, build_inputs=build_inputs,
+                         compare_options={"parent_function": gradle_split if group else None},
+                         app=app, configuration=configuration, sparse=sparse, init_script=init_script,
+                         worktree_dir=worktree_dir, cache=CommitGraphCache(cache_dir), parallel=parallel)
+    except CommandError as e:
+        fail(e)
+
+    os.makedirs(output_dir, exist_ok=True)
+    style = dark_mode_style if dark_mode else light_mode_style
+    summary = timeline_summary(steps)
+    for i, (step, step_summary) in enumerate(zip(steps, summary["steps"])):
+        subject = repo.git.execute(["git", "log", "-1", "--format=%s", step.newer])
+        step_summary["subject"] = subject
+        name = f"{i + 1:03}_{step.older[0:11]}_{step.newer[0:11]}"
+        if not len(step.diff):
+            rprint(f"[cyan]{step.newer[0:11]}[/cyan] {subject}: no differences")
+            continue
+        counts = (f"[green]+{step_summary['added_edges']}[/green] [red]-{step_summary['removed_edges']}[/red] edges, "
+                  f"[green]+{step_summary['added_nodes']}[/green] [red]-{step_summary['removed_nodes']}[/red] nodes")
+        output_file = Path(output_dir, f"{name}.{output_format}")
+        if output_format == "jsonl":
+            save_diff_jsonl(step.diff, output_file)
+        else:
+            try:
+                render_diff(step.diff, output_file.with_suffix(".dot"), [output_file], style=style,
+                            caption=f"{step.older[0:11]} to {step.newer[0:11]} {subject}")
+            except CommandError as e:
+                fail(e)
+        step_summary["output"] = f"{output_file}"
+        rprint(f"[cyan]{step.newer[0:11]}[/cyan] {subject}: {counts} [cyan]{output_file}")
+    summary_file = Path(output_dir, "summary.json")
+    summary_file.write_text(json.dumps(summary, indent=2))
+    totals = summary["totals"]
+    rprint(f"[yellow]{summary['changed_steps']} of {len(steps)} steps changed dependencies, "
+           f"[green]+{totals['added_edges']}[/green] [red]-{totals['removed_edges']}[/red] edges in total, "
+           f"see [cyan]{summary_file}")
@@ -0,0 +1,57 @@
+import json
+import os
+
+import click
+from rich import print as rprint
+
+from .commands import commands
+from ..error import fail
+from ..graph_file import load_graph_from_argument
+from ..why import PathIndex, why
+
+
+@commands.command(name="why", help="Show the shortest paths by which SOURCE depends on TARGET")
+@click.argument("file")
+@click.argument("source")
+@click.argument("target")
+@click.option("--older", default=None, help="An older graph, to list the edges new since it on those paths")
+@click.option("--limit", "-n", default=10, help="Most shortest paths to show")
+@click.option("--external", is_flag=True, default=False,
+              help="Include external modules when reading gradle dependencies outputs")
+@click.option("as_json", "--json", is_flag=True, default=False, help="Print the answer as JSON")
+@click.option("--scratch-dir", default="output", help="Directory for intermediate files")
+def cmd_why(file: str, source: str, target: str, older: str, limit: int, external: bool, as_json: bool,
+            scratch_dir: str):
+    os.makedirs(scratch_dir, exist_ok=True)
+    graph = load_graph_from_argument(file, os.path.join(scratch_dir, "why.deps"), include_external=external)
+    for node in [source, target]:
+        if node not in graph:
+            fail(f"[cyan]{node}[/cyan] is not in [cyan]{file}")
+    older_index = None
+    if older:
+        older_index = PathIndex(load_graph_from_argument(older, os.path.join(scratch_dir, "why_older.deps"),
+                                                         include_external=external))
+    answer = why(PathIndex(graph), source, target, older=older_index, limit=limit)
+    if as_json:
+        print(json.dumps(answer, indent=2))
+        return
+    if answer["distance"] is None:
+        rprint(f"[cyan]{source}[/cyan] does not depend on [cyan]{target}")
+        return
+    new_edges = {(edge["from"], edge["to"]) for edge in answer.get("new_edges", [])}
+    more = "+" if answer["path_count"] > limit else ""
+    rprint(f"[cyan]{source}[/cyan] depends on [cyan]{target}[/cyan] through [cyan]{answer['distance']}[/cyan] edges, "
+           f"by [cyan]{min(answer['path_count'], limit)}{more}[/cyan] shortest paths:")
+    for path in answer["paths"]:
+        rprint(f"[cyan]{path[0]}[/cyan]" + "".join(
+            f" {'[green]' if (u, v) in new_edges else '[yellow]'}->[/] [cyan]{v}[/cyan]"
+            for u, v in zip(path, path[1:])))
+    if older:
+        if answer["older_distance"] is None:
+            rprint(f"[yellow]Not a dependency in [cyan]{older}[/cyan], new edges on its paths:")
+        else:
+            rprint(f"[yellow]Already a dependency in [cyan]{older}[/cyan] through "
+                   f"[cyan]{answer['older_distance']}[/cyan] edges, new edges on its paths:")
+        for edge in answer["new_edges"]:
+            rprint(f"  [cyan]{edge['from']}[/cyan] [green]->[/green] [cyan]{edge['to']}[/cyan] "
+                   f"(shortest path through it: {edge['distance']})")
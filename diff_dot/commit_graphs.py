@@ -0,0 +1,72 @@
+"""Resolved graphs of commits, stored so each commit only needs resolving by gradle once"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from networkx.classes import DiGraph
+
+from .compressed import open_text
+from .fingerprint import fingerprint, read_fingerprint, store_fingerprint, write_fingerprint
+from .graph_file import load_graph
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache", "gdiff", "graphs")
+
+
+class CommitGraphCache(object):
+    """Graphs as compressed .deps files, keyed by commit and by how the graph was resolved.
+
+    Each graph's fingerprint is stored next to it and kept with the graph on loading, see stored_fingerprint."""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or default_cache_dir())
+
+    def path(self, hexsha: str, *key) -> Path:
+        key_hash = hashlib.sha256("\n".join(map(str, key)).encode()).hexdigest()[0:12]
+        return self.directory / f"{hexsha}_{key_hash}.deps.gz"
+
+    def fingerprint_path(self, hexsha: str, *key) -> Path:
+        return self.path(hexsha, *key).with_suffix("").with_suffix(".fingerprint.gz")
+
+    def get(self, hexsha: str, *key) -> Optional[DiGraph]:
+        path = self.path(hexsha, *key)
+        if not path.exists():
+            return None
+        graph = load_graph(path)
+        fingerprint_path = self.fingerprint_path(hexsha, *key)
+        if fingerprint_path.exists():
+            with open_text(fingerprint_path) as file:
+                store_fingerprint(graph, read_fingerprint(file))
+        else:
+            self._put_fingerprint(graph, fingerprint_path)
+        return graph
+
+    def put(self, hexsha: str, *key, graph: DiGraph):
+        """Written to temporary files first, so concurrent readers never see a partial graph"""
+        self._write(self.path(hexsha, *key), lambda file: write_deps(graph, file))
+        self._put_fingerprint(graph, self.fingerprint_path(hexsha, *key))
+
+    def _put_fingerprint(self, graph: DiGraph, path: Path):
+        graph_fingerprint = fingerprint(graph)
+        self._write(path, lambda file: write_fingerprint(graph_fingerprint, file))
+        store_fingerprint(graph, graph_fingerprint)
+
+    def _write(self, path: Path, write):
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".gz")
+        os.close(handle)
+        with open_text(temporary, "w") as file:
+            write(file)
+        os.replace(temporary, path)
+
+
+def write_deps(graph: DiGraph, file):
+    for node in graph.nodes:
+        successors = graph.succ[node]
+        if not successors and not graph.pred[node]:
+            file.write(f"{node}\n")
+        for successor in successors:
+            file.write(f"{node} -> {successor}\n")
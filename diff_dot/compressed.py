@@ -0,0 +1,84 @@
+"""Reading and writing gzip, xz and zstd compressed files as if they were plain text.
+
+Compression is detected from the first bytes of files being read and from the suffix of files being written.
+zstd needs Python 3.14's compression.zstd or the zstandard package."""
+import gzip
+import io
+import lzma
+from pathlib import Path
+from typing import Optional, TextIO
+
+_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+SUFFIXES = {
+    ".gz": "gzip",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+
+def compression_of_content(content: bytes) -> Optional[str]:
+    for magic, compression in _MAGIC.items():
+        if content.startswith(magic):
+            return compression
+    return None
+
+
+def compression_of(path) -> Optional[str]:
+    """The compression of an existing file by its magic bytes, otherwise by its suffix"""
+    path = Path(path).expanduser()
+    if path.is_file():
+        with open(path, "rb") as file:
+            return compression_of_content(file.read(6))
+    return SUFFIXES.get(path.suffix)
+
+
+def uncompressed_suffix(path) -> str:
+    """The suffix of path without any compression suffix, e.g. .deps for baseline.deps.gz"""
+    path = Path(path)
+    if path.suffix in SUFFIXES:
+        return Path(path.stem).suffix
+    return path.suffix
+
+
+def open_text(path, mode: str = "r") -> TextIO:
+    """open for text, decompressing reads or compressing writes as needed"""
+    path = Path(path).expanduser()
+    compression = compression_of(path) if "r" in mode else SUFFIXES.get(path.suffix)
+    text_mode = mode if "t" in mode else f"{mode}t"
+    if compression == "gzip":
+        return gzip.open(path, text_mode)
+    if compression == "xz":
+        return lzma.open(path, text_mode)
+    if compression == "zstd":
+        return _zstd().open(path, text_mode)
+    return open(path, mode)
+
+
+def decompress(content: bytes) -> bytes:
+    compression = compression_of_content(content)
+    if compression == "gzip":
+        return gzip.decompress(content)
+    if compression == "xz":
+        return lzma.decompress(content)
+    if compression == "zstd":
+        with _zstd().open(io.BytesIO(content), "rb") as file:
+            return file.read()
+    return content
+
+
+def _zstd():
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        raise IOError("Reading or writing zstd needs Python 3.14 or the zstandard package") from None
@@ -1,42 +1,109 @@
 import re
+import sys
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from functools import cached_property
+from itertools import pairwise
+from typing import Iterator, Tuple
 
 import networkx as nx
 from networkx.classes import DiGraph
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Dependency:
     from_name: str
     to_name: str
 
-    @cached_property
+    @property
     def reversed(self):
         return Dependency(self.to_name, self.from_name)
 
     def __str__(self):
         return f"{self.from_name} -> {self.to_name}"
 
-    @cached_property
+    @property
     def rich_str(self):
         return f"[cyan]{self.from_name}[/] [yellow]->[/] [cyan]{self.to_name}[/]"
 
-    @cached_property
+    @property
     def rich_str_both(self):
         return f"[cyan]{self.from_name}[/] [yellow]<-->[/] [cyan]{self.to_name}[/]"
 
 
-class Dependencies:
+class _DependencyEdges(ABC):
+    """Operations shared by stored Dependencies and lazy views over them, in terms of (from_name, to_name) pairs"""
 
-    def __init__(self):
-        self._dependencies = set()
+    @abstractmethod
+    def _pairs(self) -> Iterator[Tuple[str, str]]:
+        ...
 
     def __iter__(self):
-        return self._dependencies.__iter__()
+        return (Dependency(u, v) for u, v in self._pairs())
+
+    def __contains__(self, item):
+        return (item.from_name, item.to_name) in self._pairs()
+
+    def list(self) -> [Dependency]:
+        return sorted(self, key=lambda d: (d.from_name, d.to_name))
+
+    def len(self):
+        return sum(1 for _ in self._pairs())
+
+    def copy(self):
+        new_dependencies = Dependencies()
+        for u, v in self._pairs():
+            new_dependencies.add_dependency(u, v)
+        return new_dependencies
+
+    def to_digraph(self) -> DiGraph:
+        graph = nx.DiGraph()
+        for u, v in self._pairs():
+            if u == v:
+                graph.add_node(u)
+            else:
+                graph.add_edge(u, v)
+        return graph
+
+    def flatten(self, lamda):
+        ...
+
+    def map_nodes(self, lamda):
+        return DependenciesView(self, [(_MAP_NODES, lamda)])
+
+    def filter_nodes(self, lamda):
+        return DependenciesView(self, [(_FILTER_NODES, lamda)])
+
+    def filter(self, lamda):
+        return DependenciesView(self, [(_FILTER, lamda)])
+
+
+_MAP_NODES, _FILTER_NODES, _FILTER = range(3)
+
+_has_whitespace = re.compile(r"\s").search
+
+
+class Dependencies(_DependencyEdges):
+    """Node names are interned and given ids, each edge is stored as one int packing both ids"""
+
+    def __init__(self):
+        self._names = []
+        self._ids = {}
+        self._edges = {}  # insertion ordered set of packed edges
+
+    def _id(self, name: str) -> int:
+        node_id = self._ids.get(name)
+        if node_id is None:
+            node_id = self._ids[sys.intern(name)] = len(self._names)
+            self._names.append(name)
+        return node_id
+
+    def _pairs(self):
+        names = self._names
+        for edge in self._edges:
+            yield names[edge >> 32], names[edge & 0xFFFFFFFF]
 
     def add_dependency(self, from_name: str, to_name: str):
-        self._dependencies.add(Dependency(from_name, to_name))
+        self._edges[self._id(from_name) << 32 | self._id(to_name)] = None
 
     def add_str(self, line):
         search = re.search(r"^(\S*)((?: -> \S*)*)", line)
@@ -45,62 +112,109 @@ class Dependencies:
         u = search.group(1)
         vs = search.group(2)
         if not vs:
-            self._dependencies.add(Dependency(u, u))
+            self.add_dependency(u, u)
         else:
             all_v = re.findall(r"(?: -> )(\S*)", vs)
             for v in all_v:
-                self._dependencies.add(Dependency(u, v))
+                self.add_dependency(u, v)
                 u = v
 
-    def list(self) -> [Dependency]:
-        return sorted(list(self._dependencies), key=lambda d: (d.from_name, d.to_name))
-
     def add_lines(self, lines: [str]):
         for line in lines:
             self.add_str(line)
 
+    def add_file(self, file, chunk_size: int = 1 << 20):
+        """Bulk form of add_lines for an open text file, read in large chunks.
+
+        Well formed lines are split on the literal " -> " separator, anything else goes through add_str."""
+        remainder = ""
+        while chunk := file.read(chunk_size):
+            lines = (remainder + chunk).split("\n")
+            remainder = lines.pop()
+            self._add_split_lines(lines)
+        if remainder:
+            self._add_split_lines([remainder])
+
+    def _add_split_lines(self, lines: [str]):
+        ids, edges, new_id = self._ids, self._edges, self._id
+        for line in lines:
+            names = line.split(" -> ")
+            if not all(names) or any(map(_has_whitespace, names)):
+                self.add_str(line)
+                continue
+            line_ids = [ids.get(name) for name in names]
+            if None in line_ids:
+                line_ids = [new_id(name) for name in names]
+            if len(line_ids) == 1:
+                edges[line_ids[0] << 32 | line_ids[0]] = None
+            else:
+                for u, v in pairwise(line_ids):
+                    edges[u << 32 | v] = None
+
     def copy(self):
         new_dependencies = Dependencies()
-        new_dependencies._dependencies.update(self._dependencies)
+        new_dependencies._names = list(self._names)
+        new_dependencies._ids = dict(self._ids)
+        new_dependencies._edges = dict(self._edges)
         return new_dependencies
 
     def remove(self, d: Dependency):
-        self._dependencies.remove(d)
+        try:
+            del self._edges[self._ids[d.from_name] << 32 | self._ids[d.to_name]]
+        except KeyError:
+            raise KeyError(d) from None
 
-    def to_digraph(self) -> DiGraph:
-        graph = nx.DiGraph()
-        for dependency in self:
-            if dependency.from_name == dependency.to_name:
-                graph.add_node(dependency.from_name)
-            else:
-                graph.add_edge(dependency.from_name, dependency.to_name)
-        return graph
+    def __contains__(self, item):
+        from_id = self._ids.get(item.from_name)
+        to_id = self._ids.get(item.to_name)
+        return from_id is not None and to_id is not None and (from_id << 32 | to_id) in self._edges
 
-    def flatten(self, lamda):
-        ...
+    def len(self):
+        return len(self._edges)
 
-    def __contains__(self, item):
-        return item in self._dependencies
 
-    def map_nodes(self, lamda):
-        new_dependencies = Dependencies()
-        for d in self:
-            new_dependencies.add_dependency(lamda(d.from_name), lamda(d.to_name))
-        return new_dependencies
+class DependenciesView(_DependencyEdges):
+    """Lazy result of map_nodes, filter_nodes and filter.
 
-    def filter_nodes(self, lamda):
-        new_dependencies = Dependencies()
-        for d in self:
-            if lamda(d.from_name) and lamda(d.to_name):
-                new_dependencies.add_dependency(d.from_name, d.to_name)
-        return new_dependencies
+    Chained transforms are fused into a single pass over the source, run each time the view is iterated, so it
+    reflects the source at that time. Use copy to materialise it."""
 
-    def filter(self, lamda):
-        new_dependencies = Dependencies()
-        for d in self:
-            if lamda(d):
-                new_dependencies.add_dependency(d.from_name, d.to_name)
-        return new_dependencies
+    def __init__(self, source: _DependencyEdges, transforms):
+        if isinstance(source, DependenciesView):
+            transforms = source._transforms + transforms
+            source = source._source
+        self._source = source
+        self._transforms = transforms
 
-    def len(self):
-        return len(self._dependencies)
+    def __contains__(self, item):
+        """Looked up in the source's edges when there are only filters, mapped names can only be found by a scan"""
+        if any(kind == _MAP_NODES for kind, _ in self._transforms):
+            return super().__contains__(item)
+        if item not in self._source:
+            return False
+        for kind, lamda in self._transforms:
+            if kind == _FILTER_NODES:
+                if not (lamda(item.from_name) and lamda(item.to_name)):
+                    return False
+            elif not lamda(item):
+                return False
+        return True
+
+    def _pairs(self):
+        transforms = self._transforms
+        seen = set() if any(kind == _MAP_NODES for kind, _ in transforms) else None
+        for u, v in self._source._pairs():
+            for kind, lamda in transforms:
+                if kind == _MAP_NODES:
+                    u, v = lamda(u), lamda(v)
+                elif kind == _FILTER_NODES:
+                    if not (lamda(u) and lamda(v)):
+                        break
+                elif not lamda(Dependency(u, v)):
+                    break
+            else:
+                if seen is not None:
+                    if (u, v) in seen:
+                        continue
+                    seen.add((u, v))
+                yield u, v
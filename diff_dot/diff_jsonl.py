@@ -0,0 +1,53 @@
+"""compare_graph results as JSON Lines, for tools that want the diff without rendering it
+
+One record per line, written as the result is walked, in its sorted order:
+- {"type": "group", "path": [...], "state": "newer" | "older" | null}, before the first node inside it
+- {"type": "node", "name": ..., "state": "new" | "old" | null, "transitive": bool, "group": [...] | null}
+- {"type": "edge", "from": ..., "to": ..., "state": "new" | "old" | null, "transitive": bool,
+  "indirect_distance": int | null}, after all nodes
+"""
+import json
+from typing import Iterator, TextIO
+
+from .compressed import open_text
+from .diff_result import GraphDiff, NEW, OLD, TRANSITIVE, INDIRECT
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def diff_records(graph_delta: GraphDiff) -> Iterator[dict]:
+    groups = set()
+    names = graph_delta.names
+    for i, node in enumerate(names):
+        path = []
+        for name, state in graph_delta.parent(i) or []:
+            path.append(name)
+            if tuple(path) not in groups:
+                groups.add(tuple(path))
+                yield {"type": "group", "path": list(path), "state": state}
+        flags = graph_delta.node_flags[i]
+        yield {"type": "node", "name": node, "state": _state(flags), "transitive": bool(flags & TRANSITIVE),
+               "group": path or None}
+    for u, v, flags, distance in zip(graph_delta.edge_from, graph_delta.edge_to, graph_delta.edge_flags,
+                                     graph_delta.edge_distances):
+        yield {"type": "edge", "from": names[u], "to": names[v], "state": _state(flags),
+               "transitive": bool(flags & TRANSITIVE), "indirect_distance": distance if flags & INDIRECT else None}
+
+
+def _state(flags: int):
+    if flags & NEW:
+        return "new"
+    if flags & OLD:
+        return "old"
+    return None
+
+
+def write_diff_jsonl(graph_delta: GraphDiff, file: TextIO):
+    for record in diff_records(graph_delta):
+        file.write(_encode(record))
+        file.write("\n")
+
+
+def save_diff_jsonl(graph_delta: GraphDiff, output_file):
+    with open_text(output_file, "w") as file:
+        write_diff_jsonl(graph_delta, file)
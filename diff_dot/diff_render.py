@@ -2,10 +2,11 @@ import dataclasses
 from dataclasses import dataclass
 from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import networkx as nx
 
+from .diff_result import GraphDiff, NEW, OLD, TRANSITIVE, INDIRECT
 from .dot_file import Dot
 
 
@@ -48,7 +49,7 @@ dark_mode_style = DotStyle(
 class Renderer(object):
 
     def __init__(self,
-                 graph_delta: nx.Graph,
+                 graph_delta: Union[GraphDiff, nx.DiGraph],
                  *,
                  style: DotStyle = None,
                  caption: str = "",
@@ -61,7 +62,7 @@ class Renderer(object):
                 raise Exception("Do not specify both style and dark_mode")
             style = dark_mode_style
         self.f_node_url = f_node_url
-        self.graph_delta = graph_delta
+        self.graph_delta = graph_delta if isinstance(graph_delta, GraphDiff) else GraphDiff.from_graph(graph_delta)
         self.style = style or light_mode_style
         self.nodes = {}
         self.caption = caption
@@ -109,61 +110,55 @@ class Renderer(object):
         dot.edge_style_default_append("arrowhead", "vee")
         dot.subgraph_style_default_append("style", "rounded")
         dot.subgraph_style_default_append("fontname", self.style.font_name)
-        new_nodes = self.graph_delta.nodes(data="new", default=False)
-        old_nodes = self.graph_delta.nodes(data="old", default=False)
-        parents = self.graph_delta.nodes(data="parent", default=None)
-        labels = self.graph_delta.nodes(data="label", default=None)
-        full_names = self.graph_delta.nodes(data="full_name", default=None)
-        nodes_data = self.graph_delta.nodes.data()
-        for node in sorted(self.graph_delta.nodes):
+        diff = self.graph_delta
+        dot_nodes = []
+        for i, node in enumerate(diff.names):
             parent_node = None
-            node_parent = parents[node]
+            node_parent = diff.parent(i)
             if node_parent:
                 parent_node = self._find_parent(dot, node_parent)
-            label = labels[node] or node
+            label = diff.label(i) or node
             m_label = Dot.escape_new_line(label)
-            node_name = self.node_name_map.get(full_names[node]) if self.node_name_map else None
-            dot_node = dot.new_item(label=m_label, full_name=full_names[node] or label, parent=parent_node,
+            full_name = diff.full_name(i)
+            node_name = self.node_name_map.get(full_name) if self.node_name_map else None
+            dot_node = dot.new_item(label=m_label, full_name=full_name or label, parent=parent_node,
                                     node_name=node_name)
             self.nodes[node] = dot_node
-            if new_nodes[node]:
+            dot_nodes.append(dot_node)
+            flags = diff.node_flags[i]
+            if flags & NEW:
                 color = self.style.new_color
-            elif old_nodes[node]:
+            elif flags & OLD:
                 color = self.style.old_color
             else:
                 color = self.style.fg_color
-            if nodes_data[node].get("transitive"):
+            if flags & TRANSITIVE:
                 color = self.style.transitive_color or color
             dot.property_append(dot_node, "color", color)
             dot.property_append(dot_node, "fontcolor", color)
             dot.property_append(dot_node, "tooltip", Dot.escape_new_line(dot_node.full_name))
-            if nodes_data[node].get("highlight"):
-                dot.property_append(dot_node, "fillcolor", "#add8e6")
+            fillcolor = diff.fill_colors.get(i)
+            if fillcolor is not None:
+                dot.property_append(dot_node, "fillcolor", fillcolor)
                 dot.property_append(dot_node, "style", "filled")
-            else:
-                fillcolor = nodes_data[node].get("fillcolor")
-                if fillcolor is not None:
-                    dot.property_append(dot_node, "fillcolor", fillcolor)
-                    dot.property_append(dot_node, "style", "filled")
             if self.f_node_url:
                 dot.property_append(dot_node, "URL", self.f_node_url(node))
-        for u, v, data in self.graph_delta.edges.data():
-            link = dot.new_link(self.nodes[u], self.nodes[v])
-            if data.get("new"):
+        for u, v, flags, distance in zip(diff.edge_from, diff.edge_to, diff.edge_flags, diff.edge_distances):
+            link = dot.new_link(dot_nodes[u], dot_nodes[v])
+            if flags & NEW:
                 color = self.style.new_color
-            elif data.get("old"):
+            elif flags & OLD:
                 color = self.style.old_color
             else:
                 color = self.style.fg_color
-            if data.get("transitive"):
+            if flags & TRANSITIVE:
                 color = self.style.transitive_color or color
             dot.property_append(link, "color", color)
             dot.property_append(link, "tooltip",
-                                Dot.escape_new_line(f"{self.nodes[u].full_name}\n   ->\n{self.nodes[v].full_name}"))
+                                Dot.escape_new_line(f"{dot_nodes[u].full_name}\n   ->\n{dot_nodes[v].full_name}"))
 
-            if data.get("indirect"):
+            if flags & INDIRECT:
                 dot.property_append(link, "style", "dashed")
-                distance = data.get("indirect_distance")
                 # 1 hop is a direct connection
                 # 2 can be an assumed number of hops for unlabelled
                 # 3 or more,we'll point out
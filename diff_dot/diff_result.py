@@ -0,0 +1,136 @@
+from array import array
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+import networkx as nx
+from networkx.classes import DiGraph
+
+NEW, OLD, TRANSITIVE, INDIRECT = 1, 2, 4, 8
+"""Node and edge flags, INDIRECT is only used on edges"""
+
+_HIGHLIGHT_COLOR = "#add8e6"
+
+ParentStates = Tuple[Tuple[str, Optional[str]], ...]
+"""Each level of a node's parent with its state, "newer", "older" or None"""
+
+
+@dataclass(eq=False)
+class GraphDiff:
+    """Nodes and edges of a diff, nodes are referred to by their index in names.
+
+    Flags are bitfields in arrays, parents are shared between the nodes of a group. graph is the same diff as a
+    networkx DiGraph with an attribute dict per node and edge, as compare_graph used to return, built on first use."""
+    names: List[Any] = field(default_factory=list)
+    node_flags: array = field(default_factory=lambda: array("B"))
+    node_parents: array = field(default_factory=lambda: array("i"))
+    """Index into parents, or -1"""
+    parents: List[ParentStates] = field(default_factory=list)
+    labels: Optional[List[Optional[str]]] = None
+    full_names: Optional[List[Optional[str]]] = None
+    edge_from: array = field(default_factory=lambda: array("I"))
+    edge_to: array = field(default_factory=lambda: array("I"))
+    edge_flags: array = field(default_factory=lambda: array("B"))
+    edge_distances: array = field(default_factory=lambda: array("I"))
+    """indirect_distance of INDIRECT edges, otherwise 0"""
+    fill_colors: Dict[int, str] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.names)
+
+    def counts(self) -> Dict[str, int]:
+        """Numbers of added and removed nodes and edges"""
+        return {
+            "added_nodes": sum(1 for flags in self.node_flags if flags & NEW),
+            "removed_nodes": sum(1 for flags in self.node_flags if flags & OLD),
+            "added_edges": sum(1 for flags in self.edge_flags if flags & NEW),
+            "removed_edges": sum(1 for flags in self.edge_flags if flags & OLD),
+        }
+
+    def parent(self, i: int) -> Optional[ParentStates]:
+        parent = self.node_parents[i]
+        return self.parents[parent] if parent >= 0 else None
+
+    def label(self, i: int) -> Optional[str]:
+        return self.labels[i] if self.labels else None
+
+    def full_name(self, i: int) -> Optional[str]:
+        return self.full_names[i] if self.full_names else None
+
+    @cached_property
+    def graph(self) -> DiGraph:
+        graph = nx.DiGraph()
+        for i, name in enumerate(self.names):
+            graph.add_node(name, **_flag_data(self.node_flags[i]))
+            data = graph.nodes[name]
+            parent = self.parent(i)
+            if parent:
+                data["parent"] = list(parent)
+            if self.full_names:
+                data["full_name"] = self.full_names[i]
+            if self.labels:
+                data["label"] = self.labels[i]
+            if i in self.fill_colors:
+                data["fillcolor"] = self.fill_colors[i]
+        names = self.names
+        for u, v, flags, distance in zip(self.edge_from, self.edge_to, self.edge_flags, self.edge_distances):
+            graph.add_edge(names[u], names[v], **_flag_data(flags))
+            if flags & INDIRECT:
+                graph.edges[names[u], names[v]]["indirect_distance"] = distance
+        return graph
+
+    @property
+    def nodes(self):
+        return self.graph.nodes
+
+    @property
+    def edges(self):
+        return self.graph.edges
+
+    @classmethod
+    def from_graph(cls, graph: DiGraph) -> "GraphDiff":
+        """From a DiGraph with the attributes compare_graph used to return, plus highlight and fillcolor"""
+        diff = cls(labels=[], full_names=[])
+        ids = {}
+        parent_ids = {}
+        for name, data in graph.nodes.data():
+            ids[name] = len(diff.names)
+            diff.names.append(name)
+            diff.node_flags.append(_data_flags(data))
+            parent = tuple(data.get("parent") or ())
+            if parent and parent not in parent_ids:
+                parent_ids[parent] = len(diff.parents)
+                diff.parents.append(parent)
+            diff.node_parents.append(parent_ids[parent] if parent else -1)
+            diff.labels.append(data.get("label"))
+            diff.full_names.append(data.get("full_name"))
+            fill_color = _HIGHLIGHT_COLOR if data.get("highlight") else data.get("fillcolor")
+            if fill_color is not None:
+                diff.fill_colors[ids[name]] = fill_color
+        for u, v, data in graph.edges.data():
+            diff.add_edge(ids[u], ids[v], _data_flags(data), data.get("indirect_distance") or 0)
+        return diff
+
+    def add_edge(self, u: int, v: int, flags: int, distance: int = 0):
+        self.edge_from.append(u)
+        self.edge_to.append(v)
+        self.edge_flags.append(flags)
+        self.edge_distances.append(distance)
+
+
+def _flag_data(flags: int) -> dict:
+    data = {}
+    if flags & NEW:
+        data["new"] = True
+    if flags & OLD:
+        data["old"] = True
+    if flags & TRANSITIVE:
+        data["transitive"] = True
+    if flags & INDIRECT:
+        data["indirect"] = True
+    return data
+
+
+def _data_flags(data: dict) -> int:
+    return ((NEW if data.get("new") else 0) | (OLD if data.get("old") else 0) |
+            (TRANSITIVE if data.get("transitive") else 0) | (INDIRECT if data.get("indirect") else 0))
@@ -1,20 +1,82 @@
+import asyncio
+import os
 import subprocess
 from pathlib import Path
 
 from .cmd import is_tool
-from .error import fail
+from .dot_file import Dot
+from .error import CommandError
 
 
 def render_dot_file(input_dot_path, output_image_path):
-    if not is_tool("dot"):
-        fail("Dot is not installed, see [link=https://github.com/westonal/graph-diff#setup]README.md/setup[/link]")
+    """Raises CommandError if dot is not installed or fails"""
+    command = _render_command(input_dot_path, output_image_path)
+    _check_return_code(command, subprocess.run(command).returncode)
+
+
+async def render_dot_file_async(input_dot_path, output_image_path):
+    """As render_dot_file, without blocking so several outputs can render at once"""
+    await _run(_render_command(input_dot_path, output_image_path))
+
+
+async def render_components_async(dot: Dot, output_image_paths, scratch_dir):
+    """Renders dot with each connected component laid out by its own dot process, in parallel.
+
+    The layouts are then packed into one graph by gvpack and drawn as is by neato. Worth it for large diffs with many
+    separate clusters, as dot's layout time grows faster than linearly with graph size."""
+    components = dot.components()
+    os.makedirs(scratch_dir, exist_ok=True)
+    if len(components) < 2:
+        dot_path = Path(scratch_dir, "graph.dot")
+        dot.write_dot_file(dot_path)
+        await asyncio.gather(*[render_dot_file_async(dot_path, path) for path in output_image_paths])
+        return
+    for tool in ["dot", "gvpack", "neato"]:
+        _ensure_tool(tool)
+    processes = asyncio.Semaphore(os.cpu_count() or 1)
+
+    async def layout(index, component):
+        component_path = Path(scratch_dir, f"component{index}.dot")
+        laid_out_path = Path(scratch_dir, f"component{index}_layout.dot")
+        component.write_dot_file(component_path)
+        async with processes:
+            await _run(["dot", "-Tdot", component_path, "-o", laid_out_path])
+        return laid_out_path
+
+    laid_out = await asyncio.gather(*[layout(index, component) for index, component in enumerate(components)])
+    packed_path = Path(scratch_dir, "packed.dot")
+    graph_attributes = [f"-G{key}={value}" for key, value in dot.root_props.props.items() if type(value) is not bool]
+    await _run(["gvpack", "-g", *graph_attributes, "-o", packed_path, *laid_out])
+    await asyncio.gather(*[_run(["neato", "-n2", "-s", f"-T{_image_type(path)}", packed_path, "-o", path])
+                           for path in output_image_paths])
+
+
+async def _run(command):
+    process = await asyncio.create_subprocess_exec(*map(str, command))
+    _check_return_code(command, await process.wait())
+
+
+def _render_command(input_dot_path, output_image_path):
+    _ensure_tool("dot")
+    return ["dot", f"-T{_image_type(output_image_path)}", input_dot_path, "-o", output_image_path]
+
+
+def _ensure_tool(name):
+    if not is_tool(name):
+        raise CommandError(f"{name.capitalize()} is not installed, see "
+                           f"[link=https://github.com/westonal/graph-diff#setup]README.md/setup[/link]")
+
+
+def _image_type(output_image_path):
     extension = Path(output_image_path).suffix.lower()
     if extension == ".svg":
-        type = "svg"
+        return "svg"
     else:
-        type = "png"
-    command = ["dot", f"-T{type}", input_dot_path, "-o", output_image_path]
-    return_code = subprocess.run(command).returncode
+        return "png"
+
+
+def _check_return_code(command, return_code):
+    """Raises CommandError rather than calling fail, so library callers and event loops are not exited"""
     if return_code != 0:
         join = ' '.join(map(lambda a: f"{a}", command))
-        fail(f"Dot failed return code {return_code} [cyan]{join}")
+        raise CommandError(f"{command[0].capitalize()} failed return code {return_code} [cyan]{join}")
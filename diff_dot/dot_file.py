@@ -1,7 +1,7 @@
 """Dot file generation"""
 import copy
 import os
-from functools import cached_property
+from functools import cached_property, lru_cache
 from io import TextIOWrapper, StringIO, SEEK_SET
 from os import PathLike
 from pathlib import Path
@@ -19,7 +19,7 @@ class Props(object):
         return Props(content=dict(self.props))
 
     def lines(self, *, sort=False):
-        for key in sorted(self.props) if sort else self.props:
+        for key in _sorted_keys(tuple(self.props)) if sort else self.props:
             value = self.props[key]
             if type(value) is bool:
                 yield f'{key}={"true" if value else "false"}'
@@ -46,6 +46,22 @@ class Props(object):
         self.props = dict(props.props)
 
 
+@lru_cache(maxsize=256)
+def _sorted_keys(keys: tuple) -> list:
+    """Elements of one kind share their keys, so each distinct key order is only sorted once"""
+    return sorted(keys)
+
+
+def _numbers_in_string_order(count: int):
+    """Yields 1..count in the order their decimal strings sort, by walking the digit tree rather than sorting"""
+    stack = list(range(min(9, count), 0, -1))
+    while stack:
+        number = stack.pop()
+        yield number
+        first_child = number * 10
+        stack.extend(range(min(first_child + 9, count), first_child - 1, -1))
+
+
 class Link(object):
     def __init__(self, u: "Node", v: "Node", props: Optional[Props] = None):
         self.u = u
@@ -99,6 +115,7 @@ class Dot(object):
         self._nodes = {}
         self._links = []
         self._cluster_nodes = {}
+        self._custom_names = False
         self._root_props = Props()
         self._node_default_style = Props()
         self._edge_default_style = Props()
@@ -110,6 +127,8 @@ class Dot(object):
             self.style_default_append("tooltip", self.escape_new_line(tooltip or caption))
 
     def new_item(self, *, label: str, full_name: str, parent=None, node_name=None):
+        if node_name:
+            self._custom_names = True
         node_name = node_name or self._auto_node_name()
         existing = self._nodes.get(node_name)
         if existing:
@@ -161,9 +180,10 @@ class Dot(object):
             if writer.write_props(self._root_props):
                 writer.write_line()
 
-            link_lines = [self._link_line(link) for link in sorted(self._links, key=lambda l: (l.u.name, l.v.name))]
+            link_lines = [self._link_line(link) for link in
+                          self._name_sorted(self._links, lambda l: l.u, lambda l: l.v)]
 
-            for node in sorted(filter(lambda p: not p.parent, self._nodes.values()), key=lambda n: n.name):
+            for node in self._name_sorted([node for node in self._nodes.values() if not node.parent], lambda n: n):
                 self.write_node(writer, node)
                 writer.write_line()
 
@@ -171,6 +191,87 @@ class Dot(object):
                 writer.write_line(link)
         writer.write_line("}")
 
+    @property
+    def root_props(self) -> Props:
+        return self._root_props
+
+    def _copy(self) -> "Dot":
+        """Copy with its own nodes and links, so adding cluster nodes to it leaves this Dot as it was"""
+        result = copy.copy(self)
+        result._root_props = copy.copy(self._root_props)
+        nodes = {}
+        for node in self._nodes.values():
+            parent = nodes[node.parent] if node.parent else None
+            copied = nodes[node] = Node(name=node.name, label=node.label, full_name=node.full_name, parent=parent)
+            copied.props = copy.copy(node.props)
+            if parent:
+                parent.add_child(copied)
+        result._nodes = {name: nodes[node] for name, node in self._nodes.items()}
+        result._links = [Link(nodes[link.u], nodes[link.v], link.props) for link in self._links]
+        result._cluster_nodes = {nodes[node]: nodes[cluster_node] for node, cluster_node in self._cluster_nodes.items()}
+        return result
+
+    def components(self) -> ["Dot"]:
+        """Splits into one Dot per weakly connected component, top level nodes and clusters being the units.
+
+        Components share a copy of this Dot's nodes, so node names stay unique across them, and they carry no
+        caption. This Dot is not changed."""
+        dot = self._copy()
+        # Create the cluster nodes links will need now, in write order, so components do not name new nodes
+        for link in dot._name_sorted(dot._links, lambda l: l.u, lambda l: l.v):
+            dot._link_line(link)
+
+        def top(node):
+            while node.parent:
+                node = node.parent
+            return node
+
+        joined = {}
+
+        def find(node):
+            while node in joined:
+                joined[node] = joined.get(joined[node], joined[node])
+                node = joined[node]
+            return node
+
+        for link in dot._links:
+            u, v = find(top(link.u)), find(top(link.v))
+            if u is not v:
+                joined[u] = v
+
+        components = {}
+        for node in dot._nodes.values():
+            key = find(top(node))
+            component = components.get(key)
+            if not component:
+                component = components[key] = Dot()
+                component._custom_names = True
+                component._root_props = Props({k: v for k, v in dot._root_props.props.items()
+                                               if k not in ["label", "tooltip"]})
+                component._node_default_style = dot._node_default_style
+                component._edge_default_style = dot._edge_default_style
+                component._subgraph_default_style = dot._subgraph_default_style
+                component._cluster_nodes = dot._cluster_nodes
+            component._nodes[node.name] = node
+        for link in dot._links:
+            components[find(top(link.u))]._links.append(link)
+        return list(components.values())
+
+    def _name_ranks(self) -> dict:
+        if self._custom_names:
+            return {name: rank for rank, name in enumerate(sorted(self._nodes))}
+        return {f"node{number}": rank for rank, number in enumerate(_numbers_in_string_order(len(self._nodes)))}
+
+    def _name_sorted(self, items: list, *keys) -> list:
+        """Same order as sorting items by the names of the nodes each key returns, as a stable bucket pass per key"""
+        ranks = self._name_ranks()
+        for key in reversed(keys):
+            buckets = [[] for _ in range(len(ranks))]
+            for item in items:
+                buckets[ranks[key(item).name]].append(item)
+            items = [item for bucket in buckets for item in bucket]
+        return items
+
     def _link_line(self, link: Link) -> str:
         from_node = link.u.link()
         to_node = link.v.link()
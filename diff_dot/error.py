@@ -4,3 +4,7 @@ from rich import print as rprint
 def fail(message):
     rprint(f"[red]{message}")
     exit(1)
+
+
+class CommandError(Exception):
+    """A failed external command, raised where calling fail directly is not safe, e.g. inside an event loop"""
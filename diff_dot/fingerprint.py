@@ -0,0 +1,114 @@
+"""Merkle style content hashes of a graph, to find where two graphs differ without comparing them in full"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, TextIO, Tuple
+
+from networkx.classes import DiGraph
+
+from .gradle import gradle_split
+
+Group = Tuple[str, ...]
+
+
+@dataclass
+class GraphFingerprint:
+    node_hashes: Dict[Any, bytes] = field(default_factory=dict)
+    """Hash of each node's name and its sorted out-edges"""
+    group_hashes: Dict[Group, bytes] = field(default_factory=dict)
+    """Hash of each group's name and its nodes' and subgroups' hashes, the root group is ()"""
+    group_nodes: Dict[Group, List[Any]] = field(default_factory=dict)
+    subgroups: Dict[Group, List[Group]] = field(default_factory=dict)
+
+    @property
+    def root(self) -> bytes:
+        return self.group_hashes[()]
+
+
+def fingerprint(graph: DiGraph, parent_function=gradle_split) -> GraphFingerprint:
+    result = GraphFingerprint()
+    result.group_nodes[()] = []
+    result.subgroups[()] = []
+    for node in graph.nodes:
+        hash = hashlib.sha256(f"{node}".encode())
+        for successor in sorted(f"{s}" for s in graph.succ[node]):
+            hash.update(b"\0")
+            hash.update(successor.encode())
+        result.node_hashes[node] = hash.digest()
+        parents, _ = parent_function(node) if parent_function else (None, node)
+        group = tuple(parents or ())
+        _add_group(result, group)
+        result.group_nodes[group].append(node)
+
+    def group_hash(group: Group) -> bytes:
+        children = [result.node_hashes[node] for node in result.group_nodes[group]]
+        children += [group_hash(subgroup) for subgroup in result.subgroups[group]]
+        hash = hashlib.sha256("".join(group).encode())
+        for child in sorted(children):
+            hash.update(child)
+        result.group_hashes[group] = hash.digest()
+        return result.group_hashes[group]
+
+    group_hash(())
+    return result
+
+
+def _add_group(result: GraphFingerprint, group: Group):
+    if group in result.group_nodes:
+        return
+    result.group_nodes[group] = []
+    result.subgroups[group] = []
+    parent = group[0:-1]
+    _add_group(result, parent)
+    result.subgroups[parent].append(group)
+
+
+def changed_nodes(older: GraphFingerprint, newer: GraphFingerprint) -> Set[Any]:
+    """Nodes added, removed or with changed out-edges, only descending into groups whose hashes differ"""
+    changed = set()
+    groups = [()]
+    while groups:
+        group = groups.pop()
+        if older.group_hashes.get(group) == newer.group_hashes.get(group):
+            continue
+        for node in older.group_nodes.get(group, []) + newer.group_nodes.get(group, []):
+            if older.node_hashes.get(node) != newer.node_hashes.get(node):
+                changed.add(node)
+        groups += set(older.subgroups.get(group, []) + newer.subgroups.get(group, []))
+    return changed
+
+
+def stored_fingerprint(graph: DiGraph) -> Optional[GraphFingerprint]:
+    """The fingerprint stored with graph, e.g. by CommitGraphCache, None for graphs that were not stored"""
+    return graph.graph.get("fingerprint")
+
+
+def store_fingerprint(graph: DiGraph, graph_fingerprint: GraphFingerprint):
+    graph.graph["fingerprint"] = graph_fingerprint
+
+
+def write_fingerprint(graph_fingerprint: GraphFingerprint, file: TextIO):
+    """As JSON Lines, a {"node", "group", "hash"} record per node then a {"group", "hash"} record per group"""
+    for group, nodes in graph_fingerprint.group_nodes.items():
+        for node in nodes:
+            file.write(json.dumps({"node": node, "group": group, "hash": graph_fingerprint.node_hashes[node].hex()}))
+            file.write("\n")
+    for group, group_hash in graph_fingerprint.group_hashes.items():
+        file.write(json.dumps({"group": group, "hash": group_hash.hex()}))
+        file.write("\n")
+
+
+def read_fingerprint(lines) -> GraphFingerprint:
+    result = GraphFingerprint()
+    result.group_nodes[()] = []
+    result.subgroups[()] = []
+    for line in lines:
+        record = json.loads(line)
+        group = tuple(record["group"])
+        _add_group(result, group)
+        if "node" in record:
+            result.node_hashes[record["node"]] = bytes.fromhex(record["hash"])
+            result.group_nodes[group].append(record["node"])
+        else:
+            result.group_hashes[group] = bytes.fromhex(record["hash"])
+    return result
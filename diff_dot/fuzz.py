@@ -0,0 +1,194 @@
+"""Differential fuzzing of compare_graph's alternative engines, with its plain all-pairs form as the oracle.
+
+Graph pairs are generated as deps lines, so a failing pair can be shrunk line by line and written out as a tests/
+fixture. Add an engine to ENGINES to have it checked."""
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from networkx.classes import DiGraph
+
+from .api import diff_graphs
+from .diff_result import GraphDiff
+from .fingerprint import fingerprint, stored_fingerprint, store_fingerprint
+from .gradle import gradle_split
+from .graph_diff import compare_graph
+from .graph_file import load_graph_from_deps_lines
+from .reachability_index import ReachabilityIndex, write_index
+
+Engine = Callable[[DiGraph, DiGraph, dict], GraphDiff]
+"""Diffs older and newer with compare_graph's options, must give the same result as reference"""
+
+
+def reference(older: DiGraph, newer: DiGraph, options: dict) -> GraphDiff:
+    return compare_graph(older, newer, gradle_split, **options)
+
+
+def _condense(older: DiGraph, newer: DiGraph, options: dict) -> GraphDiff:
+    return compare_graph(older, newer, gradle_split, condense=True, **options)
+
+
+def _index(older: DiGraph, newer: DiGraph, options: dict) -> GraphDiff:
+    """Timings include writing the index"""
+    with tempfile.TemporaryDirectory() as directory:
+        index_file = os.path.join(directory, "newer.reach")
+        write_index(newer, index_file)
+        with ReachabilityIndex(index_file) as index:
+            return compare_graph(older, newer, gradle_split, newer_reachability=index, **options)
+
+
+def _fingerprint(older: DiGraph, newer: DiGraph, options: dict) -> GraphDiff:
+    """diff_graphs of graphs stored with their fingerprints, timings include fingerprinting, which stored graphs skip"""
+    for graph in [older, newer]:
+        if stored_fingerprint(graph) is None:
+            store_fingerprint(graph, fingerprint(graph))
+    return diff_graphs(older, newer, **options)
+
+
+ENGINES: Dict[str, Engine] = {
+    "condense": _condense,
+    "index": _index,
+    "fingerprint": _fingerprint,
+}
+
+
+def random_names(rng: random.Random, count: int) -> List[str]:
+    """Project paths up to three groups deep, with repeated group and leaf names, and some plain names"""
+    names = set()
+    while len(names) < count:
+        if rng.random() < 0.15:
+            names.add(rng.choice("xyz") + str(rng.randrange(3)))
+        else:
+            names.add("".join(f":{rng.choice('abc')}" for _ in range(rng.randrange(1, 4))) + f":{rng.choice('pqrs')}")
+    return sorted(names)
+
+
+def random_lines(rng: random.Random, names: List[str], count: int) -> List[str]:
+    """Edges, chains, cycles and orphan lines, which load as nodes without edges"""
+    lines = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.15:
+            chain = [rng.choice(names)]
+        elif kind < 0.3:
+            chain = rng.sample(names, min(len(names), rng.randrange(2, 5)))
+            chain.append(chain[0])
+        else:
+            chain = rng.sample(names, min(len(names), rng.choice([2, 2, 2, 3])))
+        lines.append(" -> ".join(chain) + "\n")
+    return lines
+
+
+def random_graph_pair(rng: random.Random, size: int = 12):
+    """Before and after deps lines, after being before with some lines removed, added and renamed"""
+    names = random_names(rng, size)
+    before = random_lines(rng, names, size + rng.randrange(size))
+    after = [line for line in before if rng.random() > 0.2]
+    after += random_lines(rng, names + random_names(rng, 3), rng.randrange(1, 4))
+    if rng.random() < 0.3:
+        old_name = rng.choice(names)
+        new_name = random_names(rng, 1)[0]
+        after = [" -> ".join(new_name if name == old_name else name for name in line.split()[::2]) + "\n"
+                 for line in after]
+    rng.shuffle(after)
+    return before, after
+
+
+def as_data(graph_delta: GraphDiff):
+    """Everything about a diff that rendering uses, in order"""
+    return list(graph_delta.nodes(data=True)), list(graph_delta.edges(data=True))
+
+
+def _outcome(engine: Engine, before: List[str], after: List[str], options: dict):
+    try:
+        return as_data(engine(load_graph_from_deps_lines(before), load_graph_from_deps_lines(after), options))
+    except Exception as e:
+        return repr(e)
+
+
+def differs(engine: Engine, before: List[str], after: List[str], options: dict) -> bool:
+    return _outcome(reference, before, after, options) != _outcome(engine, before, after, options)
+
+
+def shrink(before: List[str], after: List[str], failing: Callable[[List[str], List[str]], bool]):
+    """Smallest before and after found by removing lines, and names from chains, while failing stays true"""
+    sides = [list(before), list(after)]
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for side in range(2):
+            i = 0
+            while i < len(sides[side]):
+                for replacement in _simpler(sides[side][i]):
+                    candidate = sides[side][0:i] + replacement + sides[side][i + 1:]
+                    attempt = [candidate, sides[1]] if side == 0 else [sides[0], candidate]
+                    if failing(*attempt):
+                        sides = attempt
+                        shrunk = True
+                        break
+                else:
+                    i += 1
+    return sides[0], sides[1]
+
+
+def _simpler(line: str) -> List[List[str]]:
+    names = line.split()[::2]
+    simpler = [[]]
+    if len(names) > 1:
+        simpler += [[" -> ".join(names[0:i] + names[i + 1:]) + "\n"] for i in range(len(names))]
+    return simpler
+
+
+def fixture_text(before: List[str], after: List[str]) -> str:
+    """As read by the tests command"""
+    return "".join(["> Before\n", *before, "> After\n", *after])
+
+
+@dataclass
+class FuzzFailure:
+    engine: str
+    run: int
+    options: dict
+    before: List[str]
+    after: List[str]
+    """Shrunk"""
+
+
+@dataclass
+class FuzzReport:
+    runs: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+    """Total seconds in each engine, and in reference, over all runs"""
+    failures: List[FuzzFailure] = field(default_factory=list)
+
+
+def fuzz(runs: int, seed: int = 0, size: int = 12, engines: Optional[Dict[str, Engine]] = None) -> FuzzReport:
+    """Runs every engine on runs random graph pairs, with and without include_shortest_transitive_path.
+
+    Each engine's first failure is shrunk and reported, it is not run again after that."""
+    engines = dict(ENGINES if engines is None else engines)
+    rng = random.Random(seed)
+    report = FuzzReport(timings={name: 0.0 for name in ["reference", *engines]})
+    for run in range(runs):
+        before, after = random_graph_pair(rng, size)
+        options = dict(include_shortest_transitive_path=rng.random() < 0.5)
+        older, newer = load_graph_from_deps_lines(before), load_graph_from_deps_lines(after)
+        start = time.perf_counter()
+        expected = as_data(reference(older, newer, options))
+        report.timings["reference"] += time.perf_counter() - start
+        for name, engine in list(engines.items()):
+            start = time.perf_counter()
+            try:
+                actual = as_data(engine(older, newer, options))
+            except Exception as e:
+                actual = repr(e)
+            report.timings[name] += time.perf_counter() - start
+            if actual != expected:
+                shrunk = shrink(before, after, lambda b, a: differs(engine, b, a, options))
+                report.failures.append(FuzzFailure(name, run, options, *shrunk))
+                del engines[name]
+        report.runs += 1
+    return report
@@ -0,0 +1,58 @@
+"""Finding the commit where a dependency edge appeared or disappeared, by binary search over resolved graphs"""
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from git import Repo
+from rich import print as rprint
+
+from .api import commit_graphs
+from .dependencies import Dependency
+from .error import CommandError
+from .git_utils import build_inputs_changed, first_parent_commits
+
+
+@dataclass
+class BisectResult:
+    hexsha: str
+    present: bool
+    """Whether the edge is in the graph from this commit on"""
+    probes: int
+    """Commits whose graphs were looked at, including good and bad"""
+
+
+def bisect_edge(repo: Repo, good, bad, edge: Dependency, *,
+                build_inputs: Optional[Iterable[str]] = None,
+                **graph_options) -> BisectResult:
+    """The first commit after good whose graph differs from good's in whether it has edge.
+
+    Only commits that change build inputs, and bad itself, are probed, assuming other commits cannot change the graph.
+    graph_options are passed to commit_graphs, give it a cache to make repeated searches cheap."""
+    commits = first_parent_commits(repo, good, bad)
+    if not commits:
+        raise CommandError(f"[cyan]{bad}[/cyan] is not a descendant of [cyan]{good}[/cyan]")
+    candidates = [commit for commit in commits[:-1] if build_inputs_changed(repo, f"{commit}^", commit, build_inputs)]
+    candidates.append(commits[-1])
+    rprint(f"[yellow]Bisecting [cyan]{len(candidates)}[/cyan] of [cyan]{len(commits)}[/cyan] commits, "
+           f"those changing build inputs")
+
+    good_graph, bad_graph = commit_graphs(repo, [good, bad], **graph_options)
+    probes = 2
+
+    def has_edge(commitish) -> bool:
+        nonlocal probes
+        probes += 1
+        graph, = commit_graphs(repo, [commitish], **graph_options)
+        return graph.has_edge(edge.from_name, edge.to_name)
+
+    good_state = good_graph.has_edge(edge.from_name, edge.to_name)
+    if bad_graph.has_edge(edge.from_name, edge.to_name) == good_state:
+        raise CommandError(f"{edge.rich_str} is {'in' if good_state else 'not in'} both [cyan]{good}[/cyan] and "
+                           f"[cyan]{bad}[/cyan]")
+    low, high = -1, len(candidates) - 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        if has_edge(candidates[middle]) == good_state:
+            low = middle
+        else:
+            high = middle
+    return BisectResult(candidates[high], not good_state, probes)
@@ -1,27 +1,200 @@
+import fcntl
+import hashlib
 import os
+import posixpath
+import threading
+import time
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
 from pathlib import Path
 from tempfile import gettempdir
+from typing import List, Optional
 
 from git import Repo
 from rich import print as rprint
 
+GRADLE_SPARSE_PATTERNS = [
+    "*.gradle",
+    "*.gradle.kts",
+    "gradle.properties",
+    "*.versions.toml",
+    "/gradle/",
+    "/gradlew",
+    "/gradlew.bat",
+    "/buildSrc/",
+    "/build-logic/",
+]
+"""Files gradle needs to configure the build and resolve dependencies, for sparse worktrees"""
 
-def create_worktree(repo: Repo, path, commitish):
-    repo.git.execute(["git", "worktree", "add", "-f", "--detach", path, commitish])
+BUILD_INPUT_GLOBS = [
+    "*.gradle",
+    "*.gradle.kts",
+    "gradle.properties",
+    "*.versions.toml",
+    "gradle/wrapper/*",
+    "buildSrc/*",
+    "build-logic/*",
+]
+"""Files that can change the dependency graph, matched against the path or file name of changed files"""
 
 
-def new_temp_worktree(repo: Repo, worktree_name, commitish):
-    tmp_worktree = os.path.join(Path(gettempdir()), worktree_name)
-    hexsha = repo.commit(commitish).hexsha
-    if os.path.exists(tmp_worktree):
-        worktree = Repo(tmp_worktree)
-        worktree.head.reset(commit=hexsha, working_tree=True)
-        rprint(
-            f"[yellow]Reset worktree [cyan]{worktree_name}[/cyan] to [cyan]{commitish}[/cyan] ([cyan]{hexsha[0:11]}[/cyan])"
-        )
-    else:
+def create_worktree(repo: Repo, path, commitish, *, checkout: bool = True):
+    command = ["git", "worktree", "add", "-f", "--detach", path, commitish]
+    if not checkout:
+        command.insert(3, "--no-checkout")
+    repo.git.execute(command)
+
+
+def changed_files(repo: Repo, commitish1, commitish2) -> [str]:
+    return repo.git.execute(["git", "diff", "--name-only", commitish1, commitish2]).splitlines()
+
+
+def build_inputs_changed(repo: Repo, commitish1, commitish2, globs=None) -> bool:
+    """Whether any file matching the build input globs differs between the commits"""
+    globs = globs or BUILD_INPUT_GLOBS
+    for path in changed_files(repo, commitish1, commitish2):
+        name = posixpath.basename(path)
+        if any(fnmatchcase(path, glob) or fnmatchcase(name, glob) for glob in globs):
+            return True
+    return False
+
+
+def first_parent_commits(repo: Repo, start, end) -> List[str]:
+    """Commits after start up to and including end, oldest first"""
+    return repo.git.execute(["git", "rev-list", "--first-parent", "--ancestry-path", "--reverse",
+                             f"{start}..{end}"]).split()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def worktree_pool(repo: Repo, size: int = 2, *, directory=None) -> "WorktreePool":
+    """The shared pool for repo's worktrees in directory, grown to at least size worktrees"""
+    directory = directory or gettempdir()
+    key = os.path.realpath(repo.common_dir), os.path.realpath(directory)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if not pool:
+            pool = _pools[key] = WorktreePool(repo, size, directory=directory)
+        with pool._condition:
+            pool.size = max(pool.size, size)
+            pool._condition.notify_all()
+        return pool
+
+
+class WorktreePool(object):
+    """Warm worktrees of one repository, kept in the temp dir and reused between runs.
+
+    Switching commit is a checkout of the existing worktree, which only rewrites files that differ, and leaves
+    untracked build outputs in place. With sparse, only the files matching sparse_patterns are checked out, sparse can
+    also be chosen per acquire. The pool is safe to share between threads, and between processes using the same
+    directory, as each worktree in use is held by an flock on the lock file next to it."""
+
+    def __init__(self, repo: Repo, size: int = 2, *, sparse: bool = False, sparse_patterns=None, directory=None):
+        self.repo = repo
+        self.directory = directory or gettempdir()
+        self.size = size
+        self.sparse = sparse
+        self.sparse_patterns = sparse_patterns or GRADLE_SPARSE_PATTERNS
+        repo_key = hashlib.sha1(os.path.realpath(repo.common_dir).encode()).hexdigest()[0:8]
+        self._name_prefix = f"gdiff_{repo_key}_"
+        self._in_use = set()
+        self._locks = {}
+        self._last_used = {}
+        self._condition = threading.Condition()
+
+    def path(self, index: int) -> str:
+        return os.path.join(Path(self.directory), f"{self._name_prefix}{index}")
+
+    @contextmanager
+    def worktree(self, commitish, *, sparse: Optional[bool] = None):
+        path = self.acquire(commitish, sparse=sparse)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def acquire(self, commitish, *, sparse: Optional[bool] = None) -> str:
+        """A worktree checked out at commitish, blocks while all worktrees are in use, here or in other processes"""
+        sparse = self.sparse if sparse is None else sparse
+        hexsha = self.repo.git.execute(["git", "rev-parse", f"{commitish}^{{commit}}"]).strip()
+        os.makedirs(self.directory, exist_ok=True)
+        with self._condition:
+            candidates = self._candidates(hexsha)
+            while not candidates:
+                self._condition.wait()
+                candidates = self._candidates(hexsha)
+            # The first free worktree no other process holds, otherwise wait for the preferred one below
+            path, lock = next(((path, lock) for path in candidates if (lock := _lock(f"{path}.lock", block=False))),
+                              (candidates[0], None))
+            self._in_use.add(path)
+        try:
+            self._locks[path] = lock or _lock(f"{path}.lock")
+            self._switch(path, commitish, hexsha, sparse)
+        except BaseException:
+            self.release(path)
+            raise
+        return path
+
+    def release(self, path: str):
+        with self._condition:
+            lock = self._locks.pop(path, None)
+            if lock:
+                lock.close()
+            self._in_use.remove(path)
+            self._last_used[path] = time.monotonic()
+            self._condition.notify()
+
+    def _candidates(self, hexsha) -> List[str]:
+        """Free worktrees, best first, one at hexsha then the least recently used warm ones, then new ones"""
+        free = [self.path(i) for i in range(self.size) if self.path(i) not in self._in_use]
+        return sorted(free, key=lambda p: (not (os.path.exists(p) and _head(p) == hexsha), not os.path.exists(p),
+                                           self._last_used.get(p, 0)))
+
+    def _switch(self, path, commitish, hexsha, sparse: bool):
+        name = os.path.basename(path)
+        start = time.perf_counter()
+        if not os.path.exists(path):
+            # git worktree add reads every worktree of the repository, so fails on seeing one that is half created
+            with _lock(os.path.join(self.directory, f"{self._name_prefix}create.lock")):
+                create_worktree(self.repo, path, hexsha, checkout=not sparse)
+            self._configure_sparse(path, sparse)
+            if sparse:
+                Repo(path).git.read_tree("-mu", "HEAD")
+            action = "Created"
+        else:
+            self._configure_sparse(path, sparse)
+            if _head(path) == hexsha:
+                action = "Reused"
+            else:
+                Repo(path).git.checkout("--force", "--detach", hexsha)
+                action = "Reset"
         rprint(
-            f"[yellow]Creating [cyan]{worktree_name}[/cyan] at [cyan]{commitish}[/cyan] ([cyan]{hexsha[0:11]}[/cyan])"
+            f"[yellow]{action} worktree [cyan]{name}[/cyan] at [cyan]{commitish}[/cyan] ([cyan]{hexsha[0:11]}[/cyan])"
+            f"{' sparse' if sparse else ''} in [cyan]{time.perf_counter() - start:.2f}s"
         )
-        create_worktree(repo, tmp_worktree, commitish)
-    return tmp_worktree
+
+    def _configure_sparse(self, path, sparse: bool):
+        git = Repo(path).git
+        if sparse:
+            git.sparse_checkout("set", "--no-cone", *self.sparse_patterns)
+        elif git.config("--worktree", "--get", "core.sparseCheckout", with_exceptions=False) == "true":
+            git.sparse_checkout("disable")
+
+
+def _head(path) -> str:
+    return Repo(path).git.rev_parse("HEAD", with_exceptions=False).strip()
+
+
+def _lock(path, *, block: bool = True):
+    """The open lock file, held with an exclusive flock until closed, None if not blocking and it is held elsewhere.
+
+    flocks belong to the open file, so separate opens in one process exclude each other as other processes do."""
+    file = open(path, "a")
+    try:
+        fcntl.flock(file, fcntl.LOCK_EX if block else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        file.close()
+        return None
+    return file
@@ -1,9 +1,13 @@
+import json
 import re
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
 
 _pattern = re.compile(
-    r"(?P<Indent>(?:[\\| ] {4}|[\\+]--- )*)(?:project (?P<Project>[^ \n]*)|(?P<Coordinate>\S+:\S+):(?P<VersionRequested>\S*)(?: -> (?P<VersionGot>\S+))?(?P<Repeated> \(\*\))?)")
+    r"(?P<Indent>(?:[\\| ] {4}|[\\+]--- )*)"
+    r"(?:project (?P<Project>[^ \n]*)"
+    r"|(?P<Coordinate>\S+:\S+):(?P<VersionRequested>\S*)(?: -> (?P<VersionGot>\S+))?(?P<Repeated> \(\*\))?)")
 
 
 @dataclass
@@ -27,41 +31,50 @@ def gradle_line_parse(line: str) -> Optional[Tuple[int, Project | GradleCoordina
             return depth, GradleCoordinate(search["Coordinate"])
 
 
-def project_dependencies_to_deps_lines(input_file: str) -> [str]:
-    import os
-    """Reads output of gradle dependencies and returns a graph file containing the local projects interdependencies"""
-    with open(os.path.expanduser(input_file)) as file:
-        return project_dependencies_lines_to_deps(lines=file.readlines())
+_project_header = re.compile("Project '([^']*)'").search
 
 
-def project_dependencies_to_deps(input_file: str, output_file: str):
-    """Reads output of gradle dependencies and outputs a graph file containing the local projects interdependencies"""
-    lines = project_dependencies_to_deps_lines(input_file)
-    with open(output_file, "w") as output:
-        output.writelines(lines)
+def project_header(line: str) -> Optional[str]:
+    """The project a report section is for, if line is the header starting one"""
+    if "Project '" in line:
+        search = _project_header(line)
+        if search:
+            return search.group(1)
 
 
 def project_dependencies_lines_to_deps(lines, *, include_external: bool = False) -> [str]:
-    stack = []
-    output_lines = []
+    parser = ProjectDependenciesParser(include_external=include_external)
     for line in lines:
-        if not stack:
-            app = re.search("Project '([^']*)'", line)
-            if app:
-                stack.append(app.group(1))
-        else:
+        parser.feed(line)
+    return parser.output_lines
+
+
+class ProjectDependenciesParser(object):
+    """Incremental form of project_dependencies_lines_to_deps, so lines can be parsed as they are produced"""
+
+    def __init__(self, *, include_external: bool = False):
+        self.include_external = include_external
+        self.output_lines = []
+        self._stack = []
+
+    def feed(self, line: str):
+        """Each Project header starts a new root, so the reports of several projects can be fed one after another"""
+        stack = self._stack
+        app = project_header(line)
+        if app:
+            stack[:] = [app]
+        elif stack:
             depth_and_module = gradle_line_parse(line)
             if depth_and_module:
                 depth, search = depth_and_module
-                if not include_external and isinstance(search, GradleCoordinate):
-                    continue
+                if not self.include_external and isinstance(search, GradleCoordinate):
+                    return
                 module = search.name
                 while len(stack) > depth:
                     stack.pop()
                 top = stack[len(stack) - 1]
                 stack.append(module)
-                output_lines += [f"{top} -> {module}\n"]
-    return output_lines
+                self.output_lines += [f"{top} -> {module}\n"]
 
 
 def gradle_split(name):
@@ -71,3 +84,26 @@ def gradle_split(name):
         return None, name
     else:
         return split[0:-1], split[-1]
+
+
+INIT_SCRIPT = Path(__file__).with_name("gdiff.init.gradle")
+"""Init script adding a gdiffDependencies task, which writes a configuration's resolved graph as JSON Lines"""
+
+
+def init_script_command(app: str, configuration: str, output_file) -> [str]:
+    return ["./gradlew", "-q", "-I", f"{INIT_SCRIPT}", f"{app}:gdiffDependencies",
+            f"-Pgdiff.configuration={configuration}", f"-Pgdiff.output={output_file}"]
+
+
+def is_project(name: str) -> bool:
+    """Whether a node is a local project, named by its path, rather than an external module"""
+    return name.startswith(":")
+
+
+def graph_jsonl_edges(lines) -> Iterator[Tuple[str, str]]:
+    """Edges written by the init script, between projects and external modules alike"""
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        yield record["from"], record["to"]
@@ -0,0 +1,86 @@
+"""Dependency reports of a whole build, one per project or all projects in one ./gradlew dependencies output.
+
+Large reports are split into a section per project, which are parsed in a process pool and merged into one graph
+file."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from . import ProjectDependenciesParser, project_dependencies_lines_to_deps, project_header
+from ..compressed import open_text
+
+PARALLEL_MIN_LINES = 20000
+"""Report lines parsed in process before handing the rest to a pool, starting one takes longer than parsing these"""
+
+
+def report_files(path) -> List[Path]:
+    """path itself if a file, otherwise the files in the directory path, in name order"""
+    path = Path(path).expanduser()
+    if not path.is_dir():
+        return [path]
+    return sorted(file for file in path.iterdir() if file.is_file() and not file.name.startswith("."))
+
+
+def split_project_reports(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Lines of each project's section, from its Project header to the next, anything before the first is dropped"""
+    section = None
+    for line in lines:
+        if project_header(line):
+            if section:
+                yield section
+            section = []
+        if section is not None:
+            section.append(line)
+    if section:
+        yield section
+
+
+def reports_to_deps_lines(paths: Iterable, *, include_external: bool = False,
+                          processes: Optional[int] = None) -> List[str]:
+    """Deps lines of every project in the reports, each line once, in the order they are first found.
+
+    Each path is a report file or a directory of them, processes limits the pool, os.cpu_count() by default.
+    Lines are parsed in process as they are read, until PARALLEL_MIN_LINES have been, so small builds and single
+    large reports are never held in memory whole. The sections after that are parsed in the pool."""
+    parsed = []
+    sections = []
+    read = 0
+    for file in chain.from_iterable(map(report_files, paths)):
+        with open_text(file) as lines:
+            if processes != 1 and read >= PARALLEL_MIN_LINES:
+                sections += split_project_reports(lines)
+                continue
+            parser = ProjectDependenciesParser(include_external=include_external)
+            for line in lines:
+                if processes != 1 and read >= PARALLEL_MIN_LINES and project_header(line):
+                    sections += split_project_reports(chain([line], lines))
+                    break
+                parser.feed(line)
+                read += 1
+            parsed.append(parser.output_lines)
+    if len(sections) < 2:
+        parsed += map(_parse_section, sections, repeat(include_external))
+        return list(dict.fromkeys(chain.from_iterable(parsed)))
+    processes = min(processes or os.cpu_count() or 1, len(sections))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # Each section comes back as one string, far cheaper to pass between processes than a list of lines
+        texts = executor.map(_parse_section_text, sections, repeat(include_external),
+                             chunksize=max(1, len(sections) // (processes * 4)))
+        parsed += (text.splitlines(keepends=True) for text in texts)
+        return list(dict.fromkeys(chain.from_iterable(parsed)))
+
+
+def reports_to_deps(paths: Iterable, output_file, *, include_external: bool = False, processes: Optional[int] = None):
+    lines = reports_to_deps_lines(paths, include_external=include_external, processes=processes)
+    with open_text(output_file, "w") as output:
+        output.writelines(lines)
+
+
+def _parse_section(lines: List[str], include_external: bool) -> List[str]:
+    return project_dependencies_lines_to_deps(lines, include_external=include_external)
+
+
+def _parse_section_text(lines: List[str], include_external: bool) -> str:
+    return "".join(dict.fromkeys(_parse_section(lines, include_external)))
@@ -1,16 +1,19 @@
 from itertools import pairwise
-from random import shuffle
-from typing import Any, Tuple, Dict
+from typing import Any, Tuple, Dict, Mapping, Optional, Iterable
 
 import networkx as nx
 from networkx.classes import DiGraph
 from networkx.exception import NetworkXNoPath, NodeNotFound
 
+from .diff_result import GraphDiff, NEW, OLD, TRANSITIVE, INDIRECT
 
-def shuffled(visible_nodes):
-    visible_nodes = list(visible_nodes)
-    shuffle(visible_nodes)
-    return visible_nodes
+
+Reachability = Mapping[Any, Mapping[Any, int]]
+"""Shortest path length from each node to every node it can reach"""
+
+
+def reachability(graph: DiGraph) -> Reachability:
+    return dict(nx.all_pairs_bellman_ford_path_length(graph))
 
 
 def compare_graph(older: DiGraph,
@@ -20,14 +23,34 @@ def compare_graph(older: DiGraph,
                   include_shortest_transitive_path: bool = False,
                   include_new: bool = True,
                   include_old: bool = True,
-                  ):
-    """The output is only changed edges and affected nodes"""
-    new_edges = newer.edges - older.edges if include_new else []
-    removed_edges = older.edges - newer.edges if include_old else []
-    graph = nx.DiGraph()
+                  newer_reachability: Optional[Reachability] = None,
+                  condense: bool = False,
+                  focus: Optional[Iterable] = None,
+                  hops: int = 1,
+                  changed_nodes: Optional[set] = None,
+                  ) -> GraphDiff:
+    """The output is only changed edges and affected nodes
+
+    Nodes and edges of the output are in sorted order, so consumers can stream it without re-sorting.
+    newer_reachability can be passed when reachability(newer) is already known, e.g. cached for a baseline.
+    Otherwise with condense, reachability is only found between affected nodes, guided by the condensation of newer
+    into its strongly connected components, which is much cheaper than all pairs for large or cyclic graphs.
+    With focus nodes, only their neighbourhoods up to hops away in either direction, in either graph, are compared.
+    Reachability between the affected nodes still comes from the whole newer graph, so indirect edges through
+    nodes outside the neighbourhood are kept.
+    changed_nodes, when known, e.g. from fingerprints, are the only nodes searched for added or removed nodes and
+    out-edges, and as with condense, reachability is only found between affected nodes."""
+    whole_older, whole_newer = older, newer
+    if focus:
+        nodes = neighbourhood(older, focus, hops) | neighbourhood(newer, focus, hops)
+        older, newer = older.subgraph(nodes), newer.subgraph(nodes)
+    new_edges = _edges_only_in(newer, older, changed_nodes) if include_new else []
+    removed_edges = _edges_only_in(older, newer, changed_nodes) if include_old else []
+    node_flags = {}
+    edge_flags = {}
+    edge_distances = {}
     new_visible_graph = nx.DiGraph()
     visible_nodes = set()
-    path_lengths_on_newer = dict(nx.all_pairs_bellman_ford_path_length(newer))
 
     def all_parents(nodes):
         result = set()
@@ -43,25 +66,27 @@ def compare_graph(older: DiGraph,
                 result += [tuple(p[0:i])]
         return result
 
+    def flag_edge(u, v, flag=0):
+        edge_flags[u, v] = edge_flags.get((u, v), 0) | flag
+
+    def flag_node(node, flag=0):
+        node_flags[node] = node_flags.get(node, 0) | flag
+
     for u, v in new_edges:
-        graph.add_edge(u, v)
-        graph.edges[u, v]["new"] = True
+        flag_edge(u, v, NEW)
         visible_nodes.update({u, v})
         new_visible_graph.add_edge(u, v)
     for u, v in removed_edges:
-        graph.add_edge(u, v)
-        graph.edges[u, v]["old"] = True
+        flag_edge(u, v, OLD)
         visible_nodes.update({u, v})
-    new_nodes = newer.nodes - older.nodes if include_new else []
+    new_nodes = _nodes_only_in(newer, older, changed_nodes) if include_new else []
     for new_node in new_nodes:
-        graph.add_node(new_node)
         visible_nodes.add(new_node)
-        graph.nodes[new_node]["new"] = True
-    old_nodes = older.nodes - newer.nodes if include_old else []
+        flag_node(new_node, NEW)
+    old_nodes = _nodes_only_in(older, newer, changed_nodes) if include_old else []
     for old_node in old_nodes:
-        graph.add_node(old_node)
         visible_nodes.add(old_node)
-        graph.nodes[old_node]["old"] = True
+        flag_node(old_node, OLD)
 
     if include_shortest_transitive_path:
         paths = dict(nx.all_pairs_bellman_ford_path(newer))
@@ -74,47 +99,60 @@ def compare_graph(older: DiGraph,
                 for a, b in pairwise(path):
                     if a in currently_visible_nodes and b in currently_visible_nodes:
                         continue
-                    get = graph.edges.get((a, b))
-                    if not get:
-                        graph.add_edge(a, b)
+                    if (a, b) not in edge_flags:
+                        flag_edge(a, b, TRANSITIVE)
                         new_visible_graph.add_edge(a, b)
                         visible_nodes.update({a, b})
-                        graph.edges[a, b]["transitive"] = True
                         for node in [a, b]:
                             if not node in currently_visible_nodes:
-                                graph.nodes[node]["transitive"] = True
+                                flag_node(node, TRANSITIVE)
+
+    if newer_reachability is not None:
+        path_lengths_on_newer = newer_reachability
+    elif condense or focus or changed_nodes is not None:
+        path_lengths_on_newer = _visible_reachability(whole_newer, visible_nodes)
+    else:
+        path_lengths_on_newer = reachability(newer)
 
     # Add existing edges for visible nodes that are linked
     for u in visible_nodes:
+        reachable_from_u = path_lengths_on_newer.get(u) or {}
         for v in visible_nodes:
             if u == v:
                 continue
-            distance = (path_lengths_on_newer.get(u) or {}).get(v) or 0
+            distance = reachable_from_u.get(v) or 0
             if distance == 1:
-                graph.add_edge(u, v)
+                flag_edge(u, v)
                 new_visible_graph.add_edge(u, v)
 
     # Add indirect edges for all affected nodes with indirect connections
-    pairs_by_distance = _all_reachability_by_length(newer)
+    pairs_by_distance = _all_reachability_by_length(path_lengths_on_newer, visible_nodes)
 
     for distance in sorted(pairs_by_distance):
         if distance <= 1:
             continue
 
-        for (u, v) in pairs_by_distance[distance]:
+        # Pairs at the same distance can hide each other, so visit them in a fixed order
+        for (u, v) in sorted(pairs_by_distance[distance]):
             if u not in visible_nodes or v not in visible_nodes:
                 continue
 
             # If we cannot currently reach from u to v, it's indirect, add it
             if _can_reach(new_visible_graph, u, v) == 0:
-                graph.add_edge(u, v)
+                flag_edge(u, v, INDIRECT)
                 new_visible_graph.add_edge(u, v)
-                graph.edges[u, v]["indirect"] = True
-                graph.edges[u, v]["indirect_distance"] = distance
+                edge_distances[u, v] = distance
+
+    result = GraphDiff()
+    result.names = sorted(visible_nodes)
+    ids = {node: i for i, node in enumerate(result.names)}
+    result.node_flags.extend(node_flags.get(node, 0) for node in result.names)
+    for (u, v) in sorted(edge_flags, key=lambda edge: (ids[edge[0]], ids[edge[1]])):
+        result.add_edge(ids[u], ids[v], edge_flags[u, v], edge_distances.get((u, v), 0))
 
     if parent_function:
-        old_parents = all_parents(older.nodes)
-        new_parents = all_parents(newer.nodes)
+        old_parents = all_parents(whole_older.nodes)
+        new_parents = all_parents(whole_newer.nodes)
         older_parents = old_parents - new_parents
         newer_parents = new_parents - old_parents
 
@@ -130,17 +168,56 @@ def compare_graph(older: DiGraph,
             expanded = expand(p)
             return zip(p, list(map(get_state, expanded)))
 
-        for node in visible_nodes:
+        parent_ids = {}
+        result.labels = []
+        result.full_names = []
+        for node in result.names:
             parents, name = parent_function(node)
             if parents:
-                states = list(get_states(parents))
-                graph.nodes[node]["parent"] = states
-                graph.nodes[node]["full_name"] = node
+                key = tuple(parents)
+                if key not in parent_ids:
+                    parent_ids[key] = len(result.parents)
+                    result.parents.append(tuple(get_states(parents)))
+                result.node_parents.append(parent_ids[key])
+                result.full_names.append(node)
             else:
-                graph.nodes[node]["full_name"] = name
-            graph.nodes[node]["label"] = name
+                result.node_parents.append(-1)
+                result.full_names.append(name)
+            result.labels.append(name)
+    else:
+        result.node_parents.extend([-1] * len(result.names))
+
+    return result
+
+
+def _edges_only_in(graph: DiGraph, other: DiGraph, changed_nodes: Optional[set]):
+    if changed_nodes is None:
+        return graph.edges - other.edges
+    return {(u, v) for u in changed_nodes if u in graph for v in graph.succ[u] if not other.has_edge(u, v)}
 
-    return graph
+
+def _nodes_only_in(graph: DiGraph, other: DiGraph, changed_nodes: Optional[set]):
+    if changed_nodes is None:
+        return graph.nodes - other.nodes
+    return {node for node in changed_nodes if node in graph and node not in other}
+
+
+def neighbourhood(graph: DiGraph, focus: Iterable, hops: int) -> set:
+    """Nodes within hops of any focus node, following edges downstream and upstream"""
+    nodes = set()
+    for adjacency in [graph.succ, graph.pred]:
+        frontier = [node for node in focus if node in graph]
+        seen = set(frontier)
+        for _ in range(hops):
+            next_frontier = []
+            for node in frontier:
+                for neighbour in adjacency[node]:
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        nodes |= seen
+    return nodes
 
 
 def _can_reach(graph, u, v) -> int:
@@ -152,15 +229,71 @@ def _can_reach(graph, u, v) -> int:
         return 0
 
 
-def _all_reachability_by_length(graph: DiGraph) -> Dict[int, Tuple[Any, Any]]:
-    shortest_lengths = dict(nx.all_pairs_bellman_ford_path_length(graph))
+def _all_reachability_by_length(shortest_lengths: Reachability, nodes) -> Dict[int, Tuple[Any, Any]]:
+    """Pairs of nodes grouped by their distance"""
     pairs_by_distance = {}
-    for a in shortest_lengths:
-        reachables = shortest_lengths[a]
+    for a in nodes:
+        reachables = shortest_lengths.get(a) or {}
         for b in reachables:
+            if b not in nodes:
+                continue
             distance = reachables[b]
             if distance:
                 l = pairs_by_distance.get(distance) or []
                 l.append((a, b))
                 pairs_by_distance[distance] = l
     return pairs_by_distance
+
+
+def _visible_reachability(graph: DiGraph, visible_nodes) -> Reachability:
+    """reachability(graph) limited to pairs of visible nodes.
+
+    Which visible nodes each node reaches is found by dynamic programming over the condensation in reverse
+    topological order, so each breadth first search for distances can stop once it has found them all."""
+    condensed = nx.condensation(graph)
+    component_of = condensed.graph["mapping"]
+    visible_by_component = {}
+    for node in visible_nodes:
+        if node in component_of:
+            visible_by_component.setdefault(component_of[node], []).append(node)
+    visible_components = list(visible_by_component)
+    bits = {component: 1 << i for i, component in enumerate(visible_components)}
+
+    reaches = {}
+    for component in reversed(list(nx.topological_sort(condensed))):
+        reached = 0
+        for successor in condensed.succ[component]:
+            reached |= reaches[successor] | bits.get(successor, 0)
+        reaches[component] = reached
+
+    result = {}
+    for component, nodes in visible_by_component.items():
+        reached = reaches[component]
+        targets = set()
+        for i, target_component in enumerate(visible_components):
+            if reached >> i & 1:
+                targets.update(visible_by_component[target_component])
+        cyclic = len(condensed.nodes[component]["members"]) > 1
+        for u in nodes:
+            u_targets = targets | {v for v in nodes if v != u} if cyclic else targets
+            result[u] = _distances_to(graph, u, u_targets)
+    return result
+
+
+def _distances_to(graph: DiGraph, source, targets) -> Dict[Any, int]:
+    distances = {}
+    seen = {source}
+    frontier = [source]
+    distance = 0
+    while frontier and len(distances) < len(targets):
+        distance += 1
+        next_frontier = []
+        for node in frontier:
+            for successor in graph.succ[node]:
+                if successor not in seen:
+                    seen.add(successor)
+                    next_frontier.append(successor)
+                    if successor in targets:
+                        distances[successor] = distance
+        frontier = next_frontier
+    return distances
@@ -1,16 +1,20 @@
-from pathlib import Path
+import os
+from typing import Optional
 
 from networkx.classes import DiGraph
 from rich import print as rprint
 
+from .compressed import open_text, uncompressed_suffix, decompress
 from .dependencies import Dependencies
-from .gradle import project_dependencies_to_deps
+from .gradle import project_dependencies_lines_to_deps, graph_jsonl_edges, is_project
+from .gradle.reports import reports_to_deps, reports_to_deps_lines
 
 
 def load_graph(input_file: str) -> DiGraph:
-    with open(input_file, "r") as file:
-        lines = file.readlines()
-        return load_graph_from_deps_lines(lines)
+    dependencies = Dependencies()
+    with open_text(input_file) as file:
+        dependencies.add_file(file)
+    return dependencies.to_digraph()
 
 
 def load_graph_from_deps_lines(lines) -> DiGraph:
@@ -19,15 +23,47 @@ def load_graph_from_deps_lines(lines) -> DiGraph:
     return dependencies.to_digraph()
 
 
-def load_graph_from_argument(input_file: str, output_file: str) -> DiGraph:
-    if Path(input_file).suffix == ".deps":
+def load_graph_from_gradle_jsonl(lines, *, include_external: bool = False) -> DiGraph:
+    """Graph from the init script's output, see gradle.INIT_SCRIPT"""
+    dependencies = Dependencies()
+    for from_name, to_name in graph_jsonl_edges(lines):
+        dependencies.add_dependency(from_name, to_name)
+    if not include_external:
+        return dependencies.filter_nodes(is_project).to_digraph()
+    return dependencies.to_digraph()
+
+
+def load_graph_from_argument(input_file: str, output_file: str, *, processes: Optional[int] = None,
+                             include_external: bool = False) -> DiGraph:
+    """A deps file, or gradle dependencies outputs, either one file or a directory of them, converted to output_file.
+
+    Outputs of more than one project are parsed with up to processes processes, see gradle.reports.
+    With include_external, outputs give the graph of external modules too, not only local projects."""
+    if uncompressed_suffix(input_file) == ".deps" and not os.path.isdir(input_file):
         return load_graph(input_file=input_file)
     else:
-        project_dependencies_to_deps(input_file=input_file, output_file=output_file)
+        reports_to_deps([input_file], output_file, processes=processes, include_external=include_external)
         return load_graph(input_file=output_file)
 
 
+def load_graph_from_content(input_file: str, content: bytes) -> DiGraph:
+    """As load_graph_from_argument for content already read from input_file, without writing intermediate files"""
+    lines = decompress(content).decode().splitlines(keepends=True)
+    if uncompressed_suffix(input_file) != ".deps":
+        lines = project_dependencies_lines_to_deps(lines)
+    return load_graph_from_deps_lines(lines)
+
+
+def load_graph_from_report_directory(directory) -> DiGraph:
+    """As load_graph_from_argument for a directory of gradle dependencies outputs, without writing intermediate files"""
+    return load_graph_from_deps_lines(reports_to_deps_lines([directory]))
+
+
 def ensure_diff_not_empty(g):
-    if len(g.nodes) == 0:
-        rprint("[yellow]No differences to render")
-        exit(0)
+    if len(g) == 0:
+        no_differences()
+
+
+def no_differences():
+    rprint("[yellow]No differences to render")
+    exit(0)
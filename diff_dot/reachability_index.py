@@ -0,0 +1,131 @@
+"""Precomputed reachability of a stored graph, saved next to it and memory-mapped on load.
+
+Arrays are in native byte order, so an index is for use on the kind of machine that built it."""
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Optional
+
+from networkx.classes import DiGraph
+
+from .graph_diff import reachability
+
+INDEX_SUFFIX = ".reach"
+
+_MAGIC = b"GDRI"
+_VERSION = 1
+_HEADER = struct.Struct("=4sI32sIQQ")
+"""magic, version, sha256 of the source file, node count, names length, pair count"""
+
+
+def index_path(input_file) -> Path:
+    return Path(f"{input_file}{INDEX_SUFFIX}")
+
+
+def file_hash(input_file) -> bytes:
+    with open(input_file, "rb") as file:
+        return hashlib.file_digest(file, "sha256").digest()
+
+
+def write_index(graph: DiGraph, output_file, source_hash: bytes = bytes(32)):
+    """Writes reachability(graph) as compressed sparse rows, each node's reachable nodes and their distances"""
+    names = list(graph.nodes)
+    ids = {name: i for i, name in enumerate(names)}
+    lengths = reachability(graph)
+    offsets = array("Q", [0])
+    targets = array("I")
+    distances = array("I")
+    for name in names:
+        for target, distance in lengths.get(name, {}).items():
+            if distance:
+                targets.append(ids[target])
+                distances.append(distance)
+        offsets.append(len(targets))
+    names_blob = _padded("\n".join(names).encode())
+    with open(output_file, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, source_hash, len(names), len(names_blob), len(targets)))
+        file.write(names_blob)
+        file.write(offsets.tobytes())
+        file.write(_padded(targets.tobytes()))
+        file.write(_padded(distances.tobytes()))
+
+
+def _padded(content: bytes) -> bytes:
+    return content + bytes(-len(content) % 8)
+
+
+def build_index_for(input_file, graph: DiGraph) -> Path:
+    output_file = index_path(input_file)
+    write_index(graph, output_file, source_hash=file_hash(input_file))
+    return output_file
+
+
+def load_index_for(input_file) -> Optional["ReachabilityIndex"]:
+    """The index stored next to input_file, if there is one and it was built from the current content"""
+    path = index_path(input_file)
+    if not os.path.exists(path):
+        return None
+    index = ReachabilityIndex(path)
+    if index.source_hash != file_hash(input_file):
+        index.close()
+        return None
+    return index
+
+
+class ReachabilityIndex(Mapping):
+    """Read only Reachability backed by a memory-mapped index file, rows are decoded on first use"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.source_hash, node_count, names_length, pair_count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise IOError(f"Not a reachability index: {path}")
+        self._view = view = memoryview(self._map)
+        start = _HEADER.size
+        self._names = bytes(view[start:start + names_length]).rstrip(b"\0").decode().split("\n") if node_count else []
+        start += names_length
+        self._offsets = view[start:start + 8 * (node_count + 1)].cast("Q")
+        start += 8 * (node_count + 1)
+        self._targets = view[start:start + 4 * pair_count].cast("I")
+        start += 4 * pair_count + 4 * pair_count % 8
+        self._distances = view[start:start + 4 * pair_count].cast("I")
+        self._ids = {name: i for i, name in enumerate(self._names)}
+        self._rows = {}
+
+    def close(self):
+        for view in ["_offsets", "_targets", "_distances", "_view"]:
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getitem__(self, node) -> dict:
+        row = self._rows.get(node)
+        if row is None:
+            i = self._ids[node]
+            start, end = self._offsets[i], self._offsets[i + 1]
+            names = self._names
+            row = self._rows[node] = {names[target]: distance for target, distance in
+                                      zip(self._targets[start:end], self._distances[start:end])}
+        return row
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, node):
+        return node in self._ids
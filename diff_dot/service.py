@@ -0,0 +1,214 @@
+"""Long-running diff service that keeps parsed graphs warm between requests"""
+import hashlib
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from typing import Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from networkx.classes import DiGraph
+
+from .diff_jsonl import write_diff_jsonl
+from .diff_render import Renderer, dark_mode_style, light_mode_style
+from .error import CommandError
+from .fingerprint import GraphFingerprint, fingerprint, changed_nodes
+from .gradle import gradle_split
+from .gradle.reports import report_files
+from .graph_diff import compare_graph, reachability, Reachability
+from .graph_file import load_graph_from_content, load_graph_from_report_directory
+from .why import PathIndex, why
+
+DEFAULT_PORT = 8765
+
+
+@dataclass
+class CachedGraph:
+    graph: DiGraph
+
+    @cached_property
+    def reachability(self) -> Reachability:
+        return reachability(self.graph)
+
+    @cached_property
+    def fingerprint(self) -> GraphFingerprint:
+        return fingerprint(self.graph)
+
+    @cached_property
+    def paths(self) -> PathIndex:
+        return PathIndex(self.graph)
+
+
+class GraphCache(object):
+    """LRU of parsed graphs keyed by the hash of their input file content, or of a report directory's files"""
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._graphs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._graphs)
+
+    def get(self, input_file: str) -> CachedGraph:
+        path = Path(input_file).expanduser()
+        content = None if path.is_dir() else path.read_bytes()
+        key = _directory_hash(path) if content is None else hashlib.sha256(content).hexdigest()
+        with self._lock:
+            cached = self._graphs.get(key)
+            if cached:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        if content is None:
+            cached = CachedGraph(load_graph_from_report_directory(path))
+        else:
+            cached = CachedGraph(load_graph_from_content(input_file, content))
+        with self._lock:
+            self._graphs[key] = cached
+            while len(self._graphs) > self.max_size:
+                self._graphs.popitem(last=False)
+        return cached
+
+
+def _directory_hash(directory: Path) -> str:
+    digest = hashlib.sha256()
+    for file in report_files(directory):
+        content = file.read_bytes()
+        digest.update(f"{file.name}\0{len(content)}\0".encode())
+        digest.update(content)
+    return f"directory:{digest.hexdigest()}"
+
+
+class DiffService(object):
+    """Wraps compare_graph and Renderer behind a JSON request/response
+
+    Request keys: older, newer (file paths; older may be omitted to show newer alone), caption, dark_mode, group,
+    shortest_transitive, focus (node names) and hops, as compare_graph takes them, format ("dot", "svg" or "jsonl").
+    Response keys: empty, and dot, svg or jsonl.
+    why requests have newer, source and target, optionally older and limit, see why.why for the response."""
+
+    def __init__(self, cache: Optional[GraphCache] = None):
+        self.cache = cache or GraphCache()
+
+    def diff(self, request: dict) -> dict:
+        focus = request.get("focus") or []
+        hops = request.get("hops", 1)
+        if type(focus) is not list or not all(type(node) is str for node in focus):
+            raise ValueError(f"focus must be a list of node names, got {focus!r}")
+        if type(hops) is not int or hops < 0:
+            raise ValueError(f"hops must be a non-negative integer, got {hops!r}")
+        newer = self.cache.get(request["newer"])
+        older_file = request.get("older")
+        older = self.cache.get(older_file) if older_file else CachedGraph(DiGraph())
+        if older_file and older.fingerprint.root == newer.fingerprint.root:
+            return {"empty": True}
+        graph_delta = compare_graph(older.graph, newer.graph,
+                                    parent_function=gradle_split if request.get("group", True) else None,
+                                    include_shortest_transitive_path=request.get("shortest_transitive", False),
+                                    newer_reachability=newer.reachability,
+                                    changed_nodes=changed_nodes(older.fingerprint, newer.fingerprint),
+                                    focus=focus,
+                                    hops=hops,
+                                    )
+        if request.get("format") == "jsonl":
+            jsonl = StringIO()
+            write_diff_jsonl(graph_delta, jsonl)
+            return {"empty": len(graph_delta) == 0, "jsonl": jsonl.getvalue()}
+        if older_file and len(graph_delta) == 0:
+            return {"empty": True}
+        style = dark_mode_style if request.get("dark_mode") else light_mode_style
+        if not older_file:
+            style = style.no_color()
+        dot = f"{Renderer(graph_delta, style=style, caption=request.get('caption', '')).dot}"
+        if request.get("format", "dot") == "svg":
+            svg = subprocess.run(["dot", "-Tsvg"], input=dot, capture_output=True, text=True, check=True).stdout
+            return {"empty": False, "svg": svg}
+        return {"empty": False, "dot": dot}
+
+    def why(self, request: dict) -> dict:
+        newer = self.cache.get(request["newer"])
+        older_file = request.get("older")
+        older = self.cache.get(older_file).paths if older_file else None
+        limit = request.get("limit", 10)
+        if type(limit) is not int or limit < 0:
+            raise ValueError(f"limit must be a non-negative integer, got {limit!r}")
+        return why(newer.paths, request["source"], request["target"], older=older, limit=limit)
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, cache_size: int = 32) -> ThreadingHTTPServer:
+    service = DiffService(GraphCache(cache_size))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/health":
+                self.send_error(404)
+                return
+            self._reply(200, {"cached_graphs": len(service.cache), "hits": service.cache.hits,
+                              "misses": service.cache.misses})
+
+        def do_POST(self):
+            handlers = {"/diff": service.diff, "/why": service.why}
+            if self.path not in handlers:
+                self.send_error(404)
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                self._reply(200, handlers[self.path](request))
+            except (KeyError, ValueError, OSError, subprocess.CalledProcessError) as e:
+                self._reply(400, {"error": f"{e}"})
+
+        def _reply(self, status: int, body: dict):
+            content = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", f"{len(content)}")
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def request_diff(request: dict, server: Optional[str] = None, timeout: float = 60) -> dict:
+    """Sends the diff request to a running service, falling back to running it in-process if none answers in time.
+
+    A service that answers with an error raises CommandError with its message, as running locally would fail too."""
+    if server:
+        body = json.dumps(_with_absolute_paths(request)).encode()
+        http_request = Request(f"{server.rstrip('/')}/diff", data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(http_request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except HTTPError as e:
+            raise CommandError(f"Diff service at {server} failed: {_error_message(e)}") from e
+        except (OSError, TimeoutError):
+            pass
+    return DiffService().diff(request)
+
+
+def _error_message(error: HTTPError) -> str:
+    content = error.read()
+    try:
+        return json.loads(content)["error"]
+    except (ValueError, KeyError, TypeError):
+        return f"{error.code} {error.reason}"
+
+
+def _with_absolute_paths(request: dict) -> dict:
+    request = dict(request)
+    for key in ["older", "newer"]:
+        if request.get(key):
+            request[key] = str(Path(request[key]).expanduser().absolute())
+    return request
@@ -0,0 +1,49 @@
+"""Diffs between each consecutive pair of commits in a range, resolving every commit's graph once"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from git import Repo
+from rich import print as rprint
+
+from .api import commit_graphs, diff_graphs
+from .diff_result import GraphDiff
+from .error import CommandError
+from .git_utils import build_inputs_changed, first_parent_commits
+
+
+@dataclass
+class TimelineStep:
+    older: str
+    newer: str
+    """The commit changing build inputs, later commits up to the next step's newer have the same graph"""
+    diff: GraphDiff
+
+
+def timeline(repo: Repo, start, end, *,
+             build_inputs: Optional[Iterable[str]] = None,
+             compare_options: Optional[dict] = None,
+             **graph_options) -> List[TimelineStep]:
+    """A step for each commit on the first-parent path after start up to end that changes build inputs.
+
+    All graphs are resolved up front by commit_graphs, give it parallel to run gradle in several worktrees at once,
+    and each graph is the newer side of one step and the older side of the next."""
+    commits = first_parent_commits(repo, start, end)
+    if not commits:
+        raise CommandError(f"No commits in [cyan]{start}..{end}")
+    hexsha = repo.git.execute(["git", "rev-parse", f"{start}^{{commit}}"]).strip()
+    points = [hexsha]
+    for commit in commits:
+        if build_inputs_changed(repo, points[-1], commit, build_inputs):
+            points.append(commit)
+    rprint(f"[yellow]Resolving [cyan]{len(points)}[/cyan] of [cyan]{len(commits) + 1}[/cyan] commits, "
+           f"those changing build inputs")
+    graphs = commit_graphs(repo, points, **graph_options)
+    return [TimelineStep(older, newer, diff_graphs(older_graph, newer_graph, **(compare_options or {})))
+            for older, newer, older_graph, newer_graph in zip(points, points[1:], graphs, graphs[1:])]
+
+
+def timeline_summary(steps: List[TimelineStep]) -> dict:
+    """Each step's counts of added and removed nodes and edges, and their totals"""
+    summary_steps = [{"older": step.older, "newer": step.newer, **step.diff.counts()} for step in steps]
+    totals = {key: sum(step[key] for step in summary_steps) for key in GraphDiff().counts()}
+    return {"steps": summary_steps, "changed_steps": sum(1 for step in steps if len(step.diff)), "totals": totals}
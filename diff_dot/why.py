@@ -0,0 +1,112 @@
+"""Why one node depends on another: the shortest paths between them, and the new edges those paths rely on"""
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from networkx.classes import DiGraph
+
+
+class PathIndex(object):
+    """Shortest path queries over one graph.
+
+    The breadth first search from each source, with every node's predecessors on its shortest paths, and the
+    reverse search to each target, are kept, so repeated queries about the same nodes only walk the stored results.
+    Each search is as large as the graph, so only the max_searches most recently used of each kind are kept.
+    An index can be shared between threads, at worst a search is done twice."""
+
+    def __init__(self, graph: DiGraph, max_searches: int = 32):
+        self.graph = graph
+        self.max_searches = max_searches
+        self._from = OrderedDict()
+        self._to = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _search_from(self, source) -> Tuple[Dict[Any, int], Dict[Any, List]]:
+        return self._cached(self._from, source, lambda: _search(self.graph.succ, source, with_predecessors=True))
+
+    def _distances_to(self, target) -> Dict[Any, int]:
+        return self._cached(self._to, target, lambda: _search(self.graph.pred, target)[0])
+
+    def _cached(self, searches: OrderedDict, node, search):
+        with self._lock:
+            found = searches.get(node)
+            if found is not None:
+                searches.move_to_end(node)
+                return found
+        found = search()
+        with self._lock:
+            searches[node] = found
+            while len(searches) > self.max_searches:
+                searches.popitem(last=False)
+        return found
+
+    def distance(self, source, target) -> Optional[int]:
+        """Length of the shortest path, None when target cannot be reached"""
+        if source not in self.graph:
+            return None
+        return self._search_from(source)[0].get(target)
+
+    def shortest_paths(self, source, target) -> Iterator[List]:
+        """Every shortest path from source to target, in a fixed order, lazily as there can be very many"""
+        if self.distance(source, target) is None:
+            return
+        predecessors = self._search_from(source)[1]
+        stack = [[target]]
+        while stack:
+            path = stack.pop()
+            if path[0] == source:
+                yield path
+                continue
+            for predecessor in sorted(predecessors[path[0]], reverse=True):
+                stack.append([predecessor] + path)
+
+    def edges_on_paths(self, source, target) -> Dict[Tuple[Any, Any], int]:
+        """Each edge u -> v where source reaches u and v reaches target, with the shortest path length through it.
+
+        Edges out of target and into source are left out, but in cycles other edges may only be on paths that visit a
+        node twice, finding those on simple paths alone is NP-hard."""
+        if self.distance(source, target) is None:
+            return {}
+        from_source = self._search_from(source)[0]
+        to_target = self._distances_to(target)
+        return {(u, v): from_source[u] + 1 + to_target[v]
+                for u in from_source if u != target for v in self.graph.succ[u] if v in to_target and v != source}
+
+
+def _search(adjacency, start, with_predecessors: bool = False):
+    distances = {start: 0}
+    predecessors = {start: []} if with_predecessors else None
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for node in frontier:
+            distance = distances[node] + 1
+            for neighbour in adjacency[node]:
+                found = distances.get(neighbour)
+                if found is None:
+                    distances[neighbour] = distance
+                    next_frontier.append(neighbour)
+                    if with_predecessors:
+                        predecessors[neighbour] = [node]
+                elif with_predecessors and found == distance:
+                    predecessors[neighbour].append(node)
+        frontier = next_frontier
+    return distances, predecessors
+
+
+def why(index: PathIndex, source, target, *, older: Optional[PathIndex] = None, limit: int = 10) -> dict:
+    """Answer to why source depends on target, as JSON ready data.
+
+    Keys: distance (None when it does not), paths (up to limit shortest paths), path_count (all of them, up to
+    limit + 1 to show there are more). With older, also older_distance and new_edges, the edges not in older on any
+    path from source to target, shortest first, each as {"from", "to", "distance"} where distance is the shortest path
+    through it. When older_distance is None, every path uses at least one of them."""
+    paths = list(islice(index.shortest_paths(source, target), limit + 1))
+    result = {"distance": index.distance(source, target), "paths": paths[0:limit], "path_count": len(paths)}
+    if older is not None:
+        result["older_distance"] = older.distance(source, target)
+        new_edges = [(distance, u, v) for (u, v), distance in index.edges_on_paths(source, target).items()
+                     if not older.graph.has_edge(u, v)]
+        result["new_edges"] = [{"from": u, "to": v, "distance": distance} for distance, u, v in sorted(new_edges)]
+    return result
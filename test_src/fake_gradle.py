@@ -0,0 +1,52 @@
+"""Git repositories whose gradlew prints a committed dependencies report, standing in for real gradle builds"""
+import os
+import tempfile
+from unittest import TestCase
+
+from git import Repo
+
+GRADLEW = """#!/bin/sh
+echo run >> "$GRADLE_RUNS"
+cat dependencies.txt
+"""
+
+REPORT = """------------------------------------------------------------
+Project ':app'
+------------------------------------------------------------
+
+releaseRuntimeClasspath - Runtime classpath.
+{}
+"""
+
+
+def write(path, content, mode=0o644):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(content)
+    os.chmod(path, mode)
+    return path
+
+
+class FakeGradleRepoTestCase(TestCase):
+    """A temporary directory with a repo holding gradlew, each gradlew run is counted by _gradle_runs"""
+    gradlew = GRADLEW
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.runs = os.path.join(self.directory.name, "runs")
+        os.environ["GRADLE_RUNS"] = self.runs
+        self.repo = Repo.init(os.path.join(self.directory.name, "repo"))
+        self._write("gradlew", self.gradlew, 0o755)
+
+    def tearDown(self):
+        del os.environ["GRADLE_RUNS"]
+        self.directory.cleanup()
+
+    def _write(self, name, content, mode=0o644):
+        return write(os.path.join(self.repo.working_dir, name), content, mode)
+
+    def _gradle_runs(self):
+        if not os.path.exists(self.runs):
+            return 0
+        with open(self.runs) as file:
+            return len(file.readlines())
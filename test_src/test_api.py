@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from diff_dot.api import diff_files, diff_commits, diff_graphs, render_diff
+from diff_dot.error import CommandError
+from diff_dot.graph_file import load_graph_from_deps_lines
+from test_src.fake_gradle import FakeGradleRepoTestCase, REPORT
+from test_src.test_graph_diff import as_data
+
+
+class TestApi(FakeGradleRepoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cwd = os.getcwd()
+
+    def tearDown(self):
+        self.assertEqual(self.cwd, os.getcwd())
+        super().tearDown()
+
+    def test_diff_files_concurrently(self):
+        older = self._write("older.txt", REPORT.format("+--- project :a\n|    \\--- project :b\n\\--- project :c"))
+        newers = [self._write(f"newer{i}.txt", REPORT.format(f"+--- project :a\n\\--- project :n{i}"))
+                  for i in range(8)]
+        scratch_dirs = [os.path.join(self.directory.name, f"scratch{i}") for i in range(8)]
+        for scratch_dir in scratch_dirs:
+            os.makedirs(scratch_dir)
+
+        def diff(i):
+            return as_data(diff_files(older, newers[i], scratch_dirs[i]))
+
+        expected = [diff(i) for i in range(8)]
+        with ThreadPoolExecutor(8) as executor:
+            self.assertEqual(expected, list(executor.map(diff, range(8))))
+        self.assertEqual(":app -> :a\n:app -> :n3\n", Path(scratch_dirs[3], "graph2.deps").read_text())
+
+    def test_diff_commits_concurrently(self):
+        for dependency in [":a", ":b", ":c"]:
+            self._write("build.gradle", dependency)
+            self._write("dependencies.txt", REPORT.format(f"\\--- project {dependency}"))
+            self.repo.index.add(["gradlew", "build.gradle", "dependencies.txt"])
+            self.repo.index.commit(dependency)
+        worktree_dir = os.path.join(self.directory.name, "worktrees")
+        os.makedirs(worktree_dir)
+
+        def diff(commits):
+            return as_data(diff_commits(self.repo, *commits, worktree_dir=worktree_dir))
+
+        with ThreadPoolExecutor(2) as executor:
+            first, second = executor.map(diff, [("HEAD~2", "HEAD~1"), ("HEAD~1", "HEAD")])
+        self.assertEqual(as_data(diff_lines([":app -> :a\n"], [":app -> :b\n"])), first)
+        self.assertEqual(as_data(diff_lines([":app -> :b\n"], [":app -> :c\n"])), second)
+
+    def test_render_diff_raises_when_dot_is_missing(self):
+        graph_delta = diff_lines([":app -> :a\n"], [":app -> :b\n"])
+        with mock.patch("diff_dot.dot.is_tool", return_value=False), self.assertRaisesRegex(CommandError, "Dot"):
+            render_diff(graph_delta, os.path.join(self.directory.name, "diff.dot"),
+                        [os.path.join(self.directory.name, "diff.png")])
+
+
+def diff_lines(older_lines, newer_lines):
+    return diff_graphs(load_graph_from_deps_lines(older_lines), load_graph_from_deps_lines(newer_lines))
@@ -0,0 +1,68 @@
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipUnless
+
+from diff_dot.compressed import open_text, compression_of, decompress, uncompressed_suffix, _zstd
+from diff_dot.graph_file import load_graph, load_graph_from_argument, load_graph_from_content
+
+
+def zstd_available():
+    try:
+        _zstd()
+        return True
+    except IOError:
+        return False
+
+
+class TestCompressed(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_write_and_read_by_suffix(self):
+        for name, compression in [("a.deps", None), ("a.deps.gz", "gzip"), ("a.deps.xz", "xz")]:
+            with self.subTest(name=name):
+                with open_text(self._path(name), "w") as file:
+                    file.write("a -> b\n")
+                self.assertEqual(compression, compression_of(self._path(name)))
+                with open_text(self._path(name)) as file:
+                    self.assertEqual("a -> b\n", file.read())
+
+    @skipUnless(zstd_available(), "no zstd module")
+    def test_zstd(self):
+        with open_text(self._path("a.deps.zst"), "w") as file:
+            file.write("a -> b\n")
+        self.assertEqual("zstd", compression_of(self._path("a.deps.zst")))
+        self.assertEqual([("a", "b")], list(load_graph_from_argument(self._path("a.deps.zst"), "unused").edges))
+
+    def test_detects_by_magic_bytes(self):
+        with gzip.open(self._path("renamed"), "wt") as file:
+            file.write("a -> b\n")
+        self.assertEqual([("a", "b")], list(load_graph(self._path("renamed")).edges))
+
+    def test_uncompressed_suffix(self):
+        self.assertEqual(".deps", uncompressed_suffix("baseline.deps.gz"))
+        self.assertEqual(".txt", uncompressed_suffix("dependencies.txt.zst"))
+        self.assertEqual(".deps", uncompressed_suffix("baseline.deps"))
+
+    def test_compressed_gradle_report(self):
+        with open("examples/dependencies.txt", "rb") as source, lzma.open(self._path("report.txt.xz"), "wb") as target:
+            shutil.copyfileobj(source, target)
+        expected = load_graph_from_argument("examples/dependencies.txt", self._path("plain.deps"))
+        actual = load_graph_from_argument(self._path("report.txt.xz"), self._path("report.deps.gz"))
+        self.assertEqual(list(expected.edges), list(actual.edges))
+        self.assertEqual("gzip", compression_of(self._path("report.deps.gz")))
+
+    def test_content(self):
+        content = gzip.compress(b"a -> b -> c\n")
+        self.assertEqual(b"a -> b -> c\n", decompress(content))
+        self.assertEqual([("a", "b"), ("b", "c")], list(load_graph_from_content("a.deps.gz", content).edges))
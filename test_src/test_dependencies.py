@@ -1,3 +1,4 @@
+from io import StringIO
 from unittest import TestCase
 
 from diff_dot.dependencies import Dependencies, Dependency
@@ -27,3 +28,52 @@ class TestDependencies(TestCase):
             Dependency("a", "b"),
             Dependency("b", "c"),
         ], dependencies.list())
+
+    def test_remove(self):
+        dependencies = Dependencies()
+        dependencies.add_str("a -> b -> c")
+        dependencies.remove(Dependency("a", "b"))
+        self.assertEqual([Dependency("b", "c")], dependencies.list())
+        self.assertNotIn(Dependency("a", "b"), dependencies)
+        self.assertIn(Dependency("b", "c"), dependencies)
+
+    def test_chained_transforms(self):
+        dependencies = Dependencies()
+        dependencies.add_str(":a:x -> :b:y -> :c:z")
+        dependencies.add_str(":a:x -> :b:w")
+        view = (dependencies
+                .map_nodes(lambda n: n[0:2])
+                .filter_nodes(lambda n: n != ":c")
+                .filter(lambda d: d.from_name != d.to_name))
+        self.assertEqual([Dependency(":a", ":b")], view.list())
+        self.assertEqual(1, view.len())
+        self.assertEqual([(":a", ":b")], list(view.to_digraph().edges))
+
+    def test_view_reflects_source(self):
+        dependencies = Dependencies()
+        view = dependencies.filter_nodes(lambda n: n != "c")
+        dependencies.add_str("a -> b -> c")
+        copy = view.copy()
+        dependencies.add_str("a -> d")
+        self.assertEqual([Dependency("a", "b"), Dependency("a", "d")], view.list())
+        self.assertEqual([Dependency("a", "b")], copy.list())
+
+    def test_view_contains(self):
+        dependencies = Dependencies()
+        dependencies.add_str(":a:x -> :b:y -> :c:z")
+        filtered = dependencies.filter_nodes(lambda n: n != ":c:z").filter(lambda d: d.from_name != ":b:y")
+        self.assertIn(Dependency(":a:x", ":b:y"), filtered)
+        self.assertNotIn(Dependency(":b:y", ":c:z"), filtered)
+        self.assertNotIn(Dependency(":a:x", ":c:z"), filtered)
+        mapped = dependencies.map_nodes(lambda n: n[0:2])
+        self.assertIn(Dependency(":a", ":b"), mapped)
+        self.assertNotIn(Dependency(":a:x", ":b:y"), mapped)
+
+    def test_add_file_matches_add_lines(self):
+        text = "a -> b -> c\nd\n\nx\ty -> z\ne ->  f\ng -> \n" + "h -> i\n" * 5 + "j -> k"
+        by_lines = Dependencies()
+        by_lines.add_lines(StringIO(text).readlines())
+        by_file = Dependencies()
+        by_file.add_file(StringIO(text), chunk_size=7)
+        self.assertEqual(by_lines.list(), by_file.list())
+        self.assertIn(Dependency("j", "k"), by_file)
@@ -0,0 +1,57 @@
+import json
+from io import StringIO
+from unittest import TestCase
+
+import networkx as nx
+
+from diff_dot.diff_jsonl import diff_records, write_diff_jsonl
+from diff_dot.gradle import gradle_split
+from diff_dot.graph_diff import compare_graph
+from diff_dot.graph_file import load_graph_from_deps_lines
+from test_src.test_graph_diff import fixture_graphs
+
+
+def from_records(records) -> nx.DiGraph:
+    graph = nx.DiGraph()
+    for record in records:
+        if record["type"] == "node":
+            graph.add_node(record["name"], state=record["state"], transitive=record["transitive"])
+        elif record["type"] == "edge":
+            graph.add_edge(record["from"], record["to"], state=record["state"], transitive=record["transitive"],
+                           indirect_distance=record["indirect_distance"])
+    return graph
+
+
+class TestDiffJsonl(TestCase):
+
+    def test_records(self):
+        older = load_graph_from_deps_lines([":app -> :a:x -> :b -> :c\n"])
+        newer = load_graph_from_deps_lines([":app -> :a:x -> :b -> :c\n", ":app -> :d:y\n", ":a:x -> :c\n"])
+        graph_delta = compare_graph(older, newer, parent_function=gradle_split)
+        self.assertEqual([
+            {"type": "group", "path": [":a"], "state": None},
+            {"type": "node", "name": ":a:x", "state": None, "transitive": False, "group": [":a"]},
+        ], list(diff_records(graph_delta))[0:2])
+        self.assertIn({"type": "group", "path": [":d"], "state": "newer"}, diff_records(graph_delta))
+        self.assertIn({"type": "edge", "from": ":a:x", "to": ":c", "state": "new", "transitive": False,
+                       "indirect_distance": None}, diff_records(graph_delta))
+
+    def test_indirect_distance(self):
+        older = load_graph_from_deps_lines(["a -> b -> c -> d -> e\n"])
+        newer = load_graph_from_deps_lines(["a -> b -> c -> d -> e\n", "a -> f\n", "e -> g\n"])
+        records = list(diff_records(compare_graph(older, newer)))
+        self.assertIn({"type": "edge", "from": "a", "to": "e", "state": None, "transitive": False,
+                       "indirect_distance": 4}, records)
+
+    def test_lines_round_trip_fixtures(self):
+        for name, older, newer in fixture_graphs():
+            with self.subTest(name=name):
+                graph_delta = compare_graph(older, newer, parent_function=gradle_split)
+                file = StringIO()
+                write_diff_jsonl(graph_delta, file)
+                lines = file.getvalue().splitlines()
+                actual = from_records(map(json.loads, lines))
+                expected = from_records(diff_records(graph_delta))
+                self.assertEqual(list(graph_delta.nodes), list(actual.nodes))
+                self.assertEqual(list(graph_delta.edges), list(actual.edges))
+                self.assertEqual(list(expected.edges(data=True)), list(actual.edges(data=True)))
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import networkx as nx
+
+from diff_dot.diff_render import Renderer
+from diff_dot.diff_result import GraphDiff, NEW, OLD, INDIRECT
+from diff_dot.gradle import gradle_split
+from diff_dot.graph_diff import compare_graph
+from diff_dot.graph_file import load_graph_from_deps_lines
+from test_src.test_graph_diff import fixture_graphs
+
+
+class TestGraphDiff(TestCase):
+
+    def test_flags(self):
+        older = load_graph_from_deps_lines(["a -> b -> c -> d\n", "a -> e\n"])
+        newer = load_graph_from_deps_lines(["a -> b -> c -> d\n", "d -> f\n"])
+        diff = compare_graph(older, newer)
+        self.assertEqual(["a", "d", "e", "f"], diff.names)
+        self.assertEqual([0, 0, OLD, NEW], list(diff.node_flags))
+        edges = {(diff.names[u], diff.names[v]): (flags, distance) for u, v, flags, distance in
+                 zip(diff.edge_from, diff.edge_to, diff.edge_flags, diff.edge_distances)}
+        self.assertEqual({("a", "e"): (OLD, 0), ("d", "f"): (NEW, 0), ("a", "d"): (INDIRECT, 3)}, edges)
+
+    def test_graph_view(self):
+        older = load_graph_from_deps_lines([":a:x -> :b\n"])
+        newer = load_graph_from_deps_lines([":a:x -> :b\n", ":a:x -> :c:y\n"])
+        graph = compare_graph(older, newer, parent_function=gradle_split).graph
+        self.assertEqual({"parent": [(":a", None)], "full_name": ":a:x", "label": ":x"}, graph.nodes[":a:x"])
+        self.assertEqual({"new": True, "parent": [(":c", "newer")], "full_name": ":c:y", "label": ":y"},
+                         graph.nodes[":c:y"])
+        self.assertEqual({"new": True}, graph.edges[":a:x", ":c:y"])
+
+    def test_renders_the_same_from_graph_view(self):
+        for name, older, newer in fixture_graphs():
+            with self.subTest(name=name):
+                diff = compare_graph(older, newer, parent_function=gradle_split)
+                self.assertEqual(f"{Renderer(diff).dot}", f"{Renderer(diff.graph).dot}")
+
+    def test_renderer_accepts_highlighted_digraph(self):
+        graph = nx.DiGraph()
+        graph.add_edge("a", "b")
+        graph.nodes["a"]["highlight"] = True
+        dot = f"{Renderer(graph).dot}"
+        self.assertIn('fillcolor="#add8e6"', dot)
+        self.assertEqual(1, len(GraphDiff.from_graph(graph).fill_colors))
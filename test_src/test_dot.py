@@ -0,0 +1,47 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipUnless
+
+from diff_dot.dot import render_components_async, _run
+from diff_dot.dot_file import Dot
+from diff_dot.error import CommandError
+
+
+class TestRun(TestCase):
+
+    def test_failure_raised_out_of_event_loop(self):
+        with self.assertRaisesRegex(CommandError, "return code 1"):
+            asyncio.run(_run(["false"]))
+
+
+@skipUnless(all(shutil.which(tool) for tool in ["dot", "gvpack", "neato"]), "Graphviz is not installed")
+class TestRenderComponents(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_components_packed_into_one_image(self):
+        dot = Dot(caption="caption")
+        group = dot.new_item(label="g", full_name="g")
+        a = dot.new_item(label="a", full_name="g:a", parent=group)
+        b = dot.new_item(label="b", full_name="g:b", parent=group)
+        c = dot.new_item(label="c", full_name="c")
+        d = dot.new_item(label="d", full_name="d")
+        e = dot.new_item(label="e", full_name="e")
+        f = dot.new_item(label="f", full_name="f")
+        dot.new_link(c, a)
+        dot.new_link(group, d)
+        dot.new_link(b, group)
+        dot.new_link(e, f)
+        image = os.path.join(self.directory, "graph.svg")
+        asyncio.run(render_components_async(dot, [image], os.path.join(self.directory, "scratch")))
+        with open(image) as file:
+            svg = file.read()
+        self.assertEqual(2, len([name for name in os.listdir(os.path.join(self.directory, "scratch"))
+                                 if name.endswith("_layout.dot")]))
+        for label in ["g", "a", "b", "c", "d", "e", "f"]:
+            self.assertIn(f">{label}</text>", svg)
+        self.assertEqual(4, svg.count('class="edge"'))
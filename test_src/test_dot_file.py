@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from diff_dot.dot_file import Dot, _numbers_in_string_order
+
+
+class TestDotFile(TestCase):
+
+    def test_numbers_in_string_order(self):
+        self.assertEqual(sorted(range(1, 123), key=str), list(_numbers_in_string_order(122)))
+
+    def test_nodes_and_links_written_in_name_order(self):
+        dot = Dot()
+        nodes = [dot.new_item(label=f"{i}", full_name=f"{i}") for i in range(12)]
+        dot.new_link(nodes[11], nodes[0])
+        dot.new_link(nodes[1], nodes[2])
+        dot.new_link(nodes[1], nodes[9])
+        lines = [line.strip() for line in f"{dot}".splitlines()]
+        node_lines = [line.split(" ")[0] for line in lines if "label=" in line]
+        link_lines = [line.split(" [")[0] for line in lines if "->" in line]
+        self.assertEqual(sorted(node_lines), node_lines)
+        self.assertEqual(["node12 -> node1", "node2 -> node10", "node2 -> node3"], link_lines)
+
+    def test_components(self):
+        dot = Dot(caption="caption")
+        group = dot.new_item(label="g", full_name="g")
+        a = dot.new_item(label="a", full_name="g:a", parent=group)
+        b = dot.new_item(label="b", full_name="g:b", parent=group)
+        c = dot.new_item(label="c", full_name="c")
+        d = dot.new_item(label="d", full_name="d")
+        e = dot.new_item(label="e", full_name="e")
+        dot.new_link(c, a)
+        dot.new_link(group, d)
+        dot.new_link(b, group)
+        components = dot.components()
+        self.assertEqual(6, len(dot._nodes))
+        self.assertEqual([], group.children[2:])
+        self.assertEqual([["node1", "node2", "node3", "node4", "node5", "node7"], ["node6"]],
+                         [list(component._nodes) for component in components])
+        self.assertEqual(3, len(components[0]._links))
+        self.assertNotIn("caption", f"{components[0]}")
+        self.assertEqual(f"{dot}".count("->"), sum(f"{component}".count("->") for component in components))
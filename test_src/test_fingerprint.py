@@ -0,0 +1,80 @@
+import io
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+from diff_dot.api import diff_graphs
+from diff_dot.commit_graphs import CommitGraphCache
+from diff_dot.fingerprint import fingerprint, changed_nodes, read_fingerprint, write_fingerprint, stored_fingerprint
+from diff_dot.gradle import gradle_split
+from diff_dot.graph_diff import compare_graph
+from diff_dot.graph_file import load_graph_from_deps_lines
+from test_src.test_graph_diff import fixture_graphs, random_graph, as_data
+
+
+class TestFingerprint(TestCase):
+
+    def test_same_graph_in_any_order_has_same_root(self):
+        first = load_graph_from_deps_lines([":a:x -> :b\n", ":c\n", ":b -> :a:y\n"])
+        second = load_graph_from_deps_lines([":c\n", ":b -> :a:y\n", ":a:x -> :b\n"])
+        self.assertEqual(fingerprint(first).root, fingerprint(second).root)
+        self.assertEqual(set(), changed_nodes(fingerprint(first), fingerprint(second)))
+
+    def test_changes_are_localised(self):
+        older = load_graph_from_deps_lines([":a:x -> :b\n", ":b -> :a:y\n", ":c:z -> :c:w\n"])
+        newer = load_graph_from_deps_lines([":a:x -> :b\n", ":b -> :a:y\n", ":c:z -> :c:v\n"])
+        older_fingerprint, newer_fingerprint = fingerprint(older), fingerprint(newer)
+        self.assertNotEqual(older_fingerprint.root, newer_fingerprint.root)
+        self.assertEqual(older_fingerprint.group_hashes[(":a",)], newer_fingerprint.group_hashes[(":a",)])
+        self.assertEqual({":c:z", ":c:w", ":c:v"}, changed_nodes(older_fingerprint, newer_fingerprint))
+
+    def test_compare_graph_with_changed_nodes(self):
+        rng = random.Random(37)
+        cases = list(fixture_graphs())
+        for i in range(30):
+            newer = random_graph(rng, 12, 20)
+            older = newer.copy()
+            older.remove_edges_from(rng.sample(list(older.edges), min(3, len(older.edges))))
+            older.add_edges_from(random_graph(rng, 14, 3).edges)
+            cases.append((f"random {i}", older, newer))
+        for name, older, newer in cases:
+            with self.subTest(name=name):
+                changed = changed_nodes(fingerprint(older), fingerprint(newer))
+                self.assertEqual(as_data(compare_graph(older, newer, parent_function=gradle_split)),
+                                 as_data(compare_graph(older, newer, parent_function=gradle_split,
+                                                       changed_nodes=changed)))
+
+    def test_write_and_read(self):
+        graph = load_graph_from_deps_lines([":a:x -> :b\n", ":c\n", ":b -> :a:y:z\n", "plain -> :b\n"])
+        file = io.StringIO()
+        write_fingerprint(fingerprint(graph), file)
+        self.assertEqual(fingerprint(graph), read_fingerprint(io.StringIO(file.getvalue())))
+
+    def test_stored_with_cached_graphs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CommitGraphCache(directory)
+            graph = load_graph_from_deps_lines([":a:x -> :b\n"])
+            cache.put("abc", ":app", graph=graph)
+            self.assertEqual(fingerprint(graph), stored_fingerprint(graph))
+            loaded = cache.get("abc", ":app")
+            self.assertEqual(fingerprint(graph).root, stored_fingerprint(loaded).root)
+            os.remove(cache.fingerprint_path("abc", ":app"))
+            self.assertEqual(fingerprint(graph).root, stored_fingerprint(cache.get("abc", ":app")).root)
+            self.assertTrue(cache.fingerprint_path("abc", ":app").exists())
+
+
+class TestDiffGraphs(TestCase):
+
+    def test_only_stored_fingerprints_are_used(self):
+        older = load_graph_from_deps_lines([":a -> :b\n"])
+        newer = load_graph_from_deps_lines([":a -> :b\n", ":b -> :c\n"])
+        expected = as_data(compare_graph(older, newer, parent_function=gradle_split))
+        self.assertEqual(expected, as_data(diff_graphs(older, newer)))
+        self.assertIsNone(stored_fingerprint(older))
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CommitGraphCache(directory)
+            cache.put("older", graph=older)
+            cache.put("newer", graph=newer)
+            self.assertEqual(expected, as_data(diff_graphs(cache.get("older"), cache.get("newer"))))
+            self.assertEqual(0, len(diff_graphs(cache.get("newer"), cache.get("newer"))))
@@ -0,0 +1,48 @@
+import random
+from unittest import TestCase
+
+import networkx as nx
+
+from diff_dot.fuzz import fuzz, random_graph_pair, differs, fixture_text, shrink
+from diff_dot.gradle import gradle_split
+from diff_dot.graph_diff import compare_graph
+from diff_dot.graph_file import load_graph_from_deps_lines
+
+
+def _without_old(older, newer, options):
+    return compare_graph(older, newer, gradle_split, include_old=False, **options)
+
+
+class TestFuzz(TestCase):
+
+    def test_engines_match_reference(self):
+        report = fuzz(60, seed=7)
+        self.assertEqual([], report.failures)
+        self.assertEqual(60, report.runs)
+        self.assertEqual({"reference", "condense", "index", "fingerprint"}, set(report.timings))
+
+    def test_generated_pairs(self):
+        rng = random.Random(8)
+        pairs = [random_graph_pair(rng) for _ in range(30)]
+        lines = [line for before, after in pairs for line in before + after]
+        self.assertTrue(any(" -> " not in line for line in lines))
+        self.assertTrue(any(name.count(":") == 4 for line in lines for name in line.split()))
+        self.assertTrue(any(not nx.is_directed_acyclic_graph(load_graph_from_deps_lines(before))
+                            for before, _ in pairs))
+        self.assertTrue(any(before != after for before, after in pairs))
+
+    def test_failure_is_shrunk(self):
+        report = fuzz(20, seed=7, engines={"without_old": _without_old})
+        failure, = report.failures
+        self.assertEqual("without_old", failure.engine)
+        self.assertLessEqual(len(failure.before) + len(failure.after), 2)
+        self.assertTrue(differs(_without_old, failure.before, failure.after, failure.options))
+
+    def test_shrink_removes_chain_names(self):
+        before, after = shrink(["a -> b -> c\n", "d\n"], ["e\n"],
+                               lambda b, a: any("c" in line.split() for line in b))
+        self.assertEqual((["c\n"], []), (before, after))
+
+    def test_fixture_text(self):
+        lines = fixture_text([":a -> :b\n"], [":a\n"]).splitlines(keepends=True)
+        self.assertEqual(["> Before\n", ":a -> :b\n", "> After\n", ":a\n"], lines)
@@ -0,0 +1,48 @@
+import os
+
+from diff_dot.commit_graphs import CommitGraphCache
+from diff_dot.dependencies import Dependency
+from diff_dot.error import CommandError
+from diff_dot.git_bisect import bisect_edge
+from test_src.fake_gradle import FakeGradleRepoTestCase, REPORT
+
+
+class TestBisectEdge(FakeGradleRepoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.commits = []
+        for i in range(20):
+            if i % 2:
+                self._write("src.txt", f"{i}")
+            else:
+                dependencies = [":lib-a"] + ([":lib-b"] if 10 <= i < 16 else [])
+                self._write("build.gradle", f"{i}")
+                self._write("dependencies.txt", REPORT.format("\n".join(f"+--- project {d}" for d in dependencies)))
+            self.repo.index.add(["gradlew", "build.gradle", "dependencies.txt"] + (["src.txt"] if i % 2 else []))
+            self.commits.append(self.repo.index.commit(f"commit {i}").hexsha)
+        self.options = dict(worktree_dir=self.directory.name,
+                            cache=CommitGraphCache(os.path.join(self.directory.name, "cache")))
+
+    def test_finds_where_edge_appears(self):
+        result = bisect_edge(self.repo, self.commits[0], self.commits[12],
+                             Dependency(":app", ":lib-b"), **self.options)
+        self.assertEqual((self.commits[10], True), (result.hexsha, result.present))
+
+    def test_finds_where_edge_disappears(self):
+        result = bisect_edge(self.repo, self.commits[10], self.commits[19], Dependency(":app", ":lib-b"),
+                             **self.options)
+        self.assertEqual((self.commits[16], False), (result.hexsha, result.present))
+
+    def test_probes_logarithmically_and_caches(self):
+        edge = Dependency(":app", ":lib-b")
+        result = bisect_edge(self.repo, self.commits[0], self.commits[14], edge, **self.options)
+        self.assertEqual(self.commits[10], result.hexsha)
+        self.assertLessEqual(result.probes, 5)
+        self.assertEqual(result.probes, self._gradle_runs())
+        bisect_edge(self.repo, self.commits[0], self.commits[14], edge, **self.options)
+        self.assertEqual(result.probes, self._gradle_runs())
+
+    def test_same_state_at_both_ends(self):
+        with self.assertRaises(CommandError):
+            bisect_edge(self.repo, self.commits[0], self.commits[8], Dependency(":app", ":lib-b"), **self.options)
@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import TestCase
+
+from git import Repo
+
+from diff_dot.git_utils import WorktreePool, build_inputs_changed
+
+
+class TestWorktreePool(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.repo = Repo.init(os.path.join(self.directory.name, "repo"))
+        self._commit({"build.gradle": "1", "src.txt": "1"})
+        self._commit({"build.gradle": "2", "src.txt": "2"})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _commit(self, files):
+        for name, content in files.items():
+            with open(os.path.join(self.repo.working_dir, name), "w") as file:
+                file.write(content)
+        self.repo.index.add(list(files))
+        self.repo.index.commit("commit")
+
+    def _pool(self, size=1, sparse=False):
+        return WorktreePool(self.repo, size, sparse=sparse, sparse_patterns=["*.gradle"], directory=self.directory.name)
+
+    def _read(self, worktree, name):
+        with open(os.path.join(worktree, name)) as file:
+            return file.read()
+
+    def test_worktree_is_reused_across_commits(self):
+        pool = self._pool()
+        with pool.worktree("HEAD~1") as first:
+            self.assertEqual("1", self._read(first, "build.gradle"))
+        with pool.worktree("HEAD") as second:
+            self.assertEqual("2", self._read(second, "build.gradle"))
+        self.assertEqual(first, second)
+
+    def test_concurrent_use_gets_separate_worktrees(self):
+        pool = self._pool(size=2)
+        with pool.worktree("HEAD~1") as first, pool.worktree("HEAD") as second:
+            self.assertNotEqual(first, second)
+            self.assertEqual("1", self._read(first, "build.gradle"))
+            self.assertEqual("2", self._read(second, "build.gradle"))
+
+    def _hold_in_other_process(self):
+        """A process holding one worktree of its own pool until its stdin is closed, and the worktree's path"""
+        script = ("import sys; from git import Repo; from diff_dot.git_utils import WorktreePool; "
+                  "pool = WorktreePool(Repo(sys.argv[1]), 2, directory=sys.argv[2]); "
+                  "path = pool.acquire('HEAD'); print('held', path, flush=True); sys.stdin.read(); pool.release(path)")
+        process = subprocess.Popen([sys.executable, "-c", script, self.repo.working_dir, self.directory.name],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.addCleanup(process.wait)
+        self.addCleanup(process.stdin.close)
+        for line in process.stdout:
+            if line.startswith("held "):
+                return process, line[len("held "):].strip()
+
+    def test_worktree_held_by_other_process_is_skipped(self):
+        process, held = self._hold_in_other_process()
+        with self._pool(size=2).worktree("HEAD") as worktree:
+            self.assertNotEqual(held, worktree)
+
+    def test_waits_for_worktree_held_by_other_process(self):
+        process, held = self._hold_in_other_process()
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(self._pool(size=1).acquire("HEAD")))
+        thread.start()
+        thread.join(0.5)
+        self.assertEqual([], acquired)
+        process.stdin.close()
+        thread.join(30)
+        self.assertEqual([held], acquired)
+
+    def test_sparse_checks_out_only_build_files(self):
+        pool = self._pool(sparse=True)
+        with pool.worktree("HEAD") as worktree:
+            self.assertEqual("2", self._read(worktree, "build.gradle"))
+            self.assertFalse(os.path.exists(os.path.join(worktree, "src.txt")))
+        pool.sparse = False
+        with pool.worktree("HEAD") as worktree:
+            self.assertEqual("2", self._read(worktree, "src.txt"))
+
+
+class TestBuildInputsChanged(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.repo = Repo.init(self.directory.name)
+        self._commit("README.md", "1")
+        self._commit("app/build.gradle", "1")
+        self._commit("app/src/Main.kt", "1")
+        self._commit("gradle/libs.versions.toml", "1")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _commit(self, name, content):
+        path = os.path.join(self.repo.working_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+        self.repo.index.add([name])
+        self.repo.index.commit("commit")
+
+    def test_source_change_is_not_a_build_input(self):
+        self.assertFalse(build_inputs_changed(self.repo, "HEAD~2", "HEAD~1"))
+
+    def test_nested_build_file_change(self):
+        self.assertTrue(build_inputs_changed(self.repo, "HEAD~3", "HEAD~2"))
+
+    def test_version_catalog_change(self):
+        self.assertTrue(build_inputs_changed(self.repo, "HEAD~1", "HEAD"))
+
+    def test_custom_globs(self):
+        self.assertTrue(build_inputs_changed(self.repo, "HEAD~2", "HEAD~1", ["app/src/*"]))
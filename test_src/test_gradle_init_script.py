@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from diff_dot.api import diff_commits, diff_graphs
+from diff_dot.graph_file import load_graph_from_gradle_jsonl, load_graph_from_deps_lines
+from test_src.fake_gradle import FakeGradleRepoTestCase
+from test_src.test_graph_diff import as_data
+
+FAKE_GRADLEW = """#!/bin/sh
+# Stand-in for gradle running the init script: checks the arguments and copies the commit's graph.jsonl to the output
+[ "$1" = "-q" ] && [ "$2" = "-I" ] && [ -f "$3" ] || exit 2
+[ "$4" = ":app:gdiffDependencies" ] && [ "$5" = "-Pgdiff.configuration=releaseRuntimeClasspath" ] || exit 3
+output="${6#-Pgdiff.output=}"
+mkdir -p "$(dirname "$output")"
+cp graph.jsonl "$output"
+"""
+
+GRAPH = """{"from":":app","to":":lib-a","version":null}
+{"from":":app","to":"com.example:external","version":"1.2.0"}
+{"from":":lib-a","to":":lib-b","version":null}
+{"from":"com.example:external","to":"com.example:transitive","version":"2.0"}
+"""
+
+
+class TestLoadGraphFromGradleJsonl(TestCase):
+
+    def test_projects_only_by_default(self):
+        graph = load_graph_from_gradle_jsonl(GRAPH.splitlines())
+        self.assertEqual([(":app", ":lib-a"), (":lib-a", ":lib-b")], list(graph.edges))
+
+    def test_include_external(self):
+        graph = load_graph_from_gradle_jsonl(GRAPH.splitlines(keepends=True), include_external=True)
+        self.assertIn(("com.example:external", "com.example:transitive"), graph.edges)
+        self.assertEqual(4, len(graph.edges))
+
+
+class TestDiffCommitsUsingInitScript(FakeGradleRepoTestCase):
+    gradlew = FAKE_GRADLEW
+
+    def setUp(self):
+        super().setUp()
+        self._commit(GRAPH)
+        self._commit(GRAPH.replace(":lib-b", ":lib-c"))
+
+    def _commit(self, graph):
+        self._write("build.gradle", graph)
+        self._write("graph.jsonl", graph)
+        self.repo.index.add(["gradlew", "build.gradle", "graph.jsonl"])
+        self.repo.index.commit("commit")
+
+    def test_diff(self):
+        actual = diff_commits(self.repo, "HEAD~1", "HEAD", init_script=True, worktree_dir=self.directory.name)
+        expected = diff_graphs(load_graph_from_deps_lines([":app -> :lib-a -> :lib-b\n"]),
+                               load_graph_from_deps_lines([":app -> :lib-a -> :lib-c\n"]))
+        self.assertEqual(as_data(expected), as_data(actual))
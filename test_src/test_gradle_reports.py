@@ -0,0 +1,81 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from diff_dot.gradle import project_dependencies_lines_to_deps
+from diff_dot.gradle.reports import reports_to_deps_lines, split_project_reports
+from diff_dot.graph_file import load_graph_from_argument
+from test_src.fake_gradle import write
+
+LIB_REPORT = """
+------------------------------------------------------------
+Project ':lib'
+------------------------------------------------------------
+
+releaseRuntimeClasspath - Runtime classpath of compilation 'release'.
++--- project :core
+|    \\--- project :base
+\\--- androidx.annotation:annotation:1.3.0
+
+debugRuntimeClasspath - Runtime classpath of compilation 'debug'.
+\\--- project :core
+     \\--- project :base
+"""
+
+
+class TestGradleReports(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open("examples/dependencies.txt") as file:
+            self.app_report = file.read()
+        self.reports = os.path.join(self.directory.name, "reports")
+        write(os.path.join(self.reports, "app.txt"), self.app_report)
+        write(os.path.join(self.reports, "lib.txt"), LIB_REPORT)
+        self.concatenated = write(os.path.join(self.directory.name, "all.txt"),
+                                  "Root project 'build'\n" + self.app_report + LIB_REPORT)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_split(self):
+        sections = list(split_project_reports((self.app_report + LIB_REPORT).splitlines(keepends=True)))
+        self.assertEqual(["Project ':app'\n", "Project ':lib'\n"], [section[0] for section in sections])
+
+    def test_each_project_is_its_own_root(self):
+        lines = project_dependencies_lines_to_deps((self.app_report + LIB_REPORT).splitlines(keepends=True))
+        self.assertIn(":lib -> :core\n", lines)
+        self.assertIn(":core -> :base\n", lines)
+        self.assertNotIn(":app -> :core\n", lines)
+
+    def test_merged_without_duplicates(self):
+        lines = reports_to_deps_lines([self.reports])
+        self.assertEqual(len(lines), len(set(lines)))
+        self.assertEqual(lines, reports_to_deps_lines([self.concatenated]))
+        self.assertEqual(lines, reports_to_deps_lines([self.reports, self.concatenated]))
+        self.assertEqual(set(project_dependencies_lines_to_deps(self.app_report.splitlines(keepends=True))) |
+                         {":lib -> :core\n", ":core -> :base\n"}, set(lines))
+
+    def test_process_pool(self):
+        with mock.patch("diff_dot.gradle.reports.PARALLEL_MIN_LINES", 0):
+            self.assertEqual(reports_to_deps_lines([self.reports], processes=1),
+                             reports_to_deps_lines([self.reports], processes=2))
+
+    def test_pool_takes_over_after_min_lines(self):
+        with mock.patch("diff_dot.gradle.reports.PARALLEL_MIN_LINES", 5):
+            self.assertEqual(reports_to_deps_lines([self.concatenated], processes=1),
+                             reports_to_deps_lines([self.concatenated, self.reports], processes=2))
+
+    def test_single_report_streamed_without_pool(self):
+        with (mock.patch("diff_dot.gradle.reports.PARALLEL_MIN_LINES", 5),
+              mock.patch("diff_dot.gradle.reports.ProcessPoolExecutor") as pool,
+              mock.patch("diff_dot.gradle.reports.split_project_reports", wraps=split_project_reports) as split):
+            lines = reports_to_deps_lines([os.path.join(self.reports, "lib.txt")], processes=2)
+        self.assertEqual([":lib -> :core\n", ":core -> :base\n"], lines)
+        pool.assert_not_called()
+        split.assert_not_called()
+
+    def test_load_directory(self):
+        graph = load_graph_from_argument(self.reports, os.path.join(self.directory.name, "graph.deps"))
+        self.assertTrue(graph.has_edge(":lib", ":core"))
+        self.assertTrue(graph.has_edge(":app", ":lib-a"))
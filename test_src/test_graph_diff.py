@@ -0,0 +1,78 @@
+import os
+import random
+from unittest import TestCase
+
+import networkx as nx
+
+from diff_dot.gradle import gradle_split
+from diff_dot.graph_diff import compare_graph
+from diff_dot.graph_file import load_graph_from_deps_lines
+
+
+def fixture_graphs():
+    for directory, _, files in os.walk("tests"):
+        for file_name in sorted(files):
+            with open(os.path.join(directory, file_name)) as file:
+                lines = file.readlines()
+            after = lines.index("> After\n")
+            yield file_name, load_graph_from_deps_lines(lines[1:after]), load_graph_from_deps_lines(lines[after + 1:])
+
+
+def random_graph(rng: random.Random, node_count: int, edge_count: int) -> nx.DiGraph:
+    graph = nx.DiGraph()
+    graph.add_nodes_from(f":g{rng.randrange(3)}:n{i}" for i in range(node_count))
+    nodes = list(graph.nodes)
+    graph.add_edges_from((rng.choice(nodes), rng.choice(nodes)) for _ in range(edge_count))
+    graph.remove_edges_from(nx.selfloop_edges(graph))
+    return graph
+
+
+def as_data(graph: nx.DiGraph):
+    return list(graph.nodes(data=True)), list(graph.edges(data=True))
+
+
+class TestCompareGraphCondense(TestCase):
+
+    def assertSameDiff(self, older, newer, **kwargs):
+        expected = compare_graph(older, newer, parent_function=gradle_split, **kwargs)
+        actual = compare_graph(older, newer, parent_function=gradle_split, condense=True, **kwargs)
+        self.assertEqual(as_data(expected), as_data(actual))
+
+    def test_fixtures(self):
+        for name, older, newer in fixture_graphs():
+            for include_shortest_transitive_path in [False, True]:
+                with self.subTest(name=name, include_shortest_transitive_path=include_shortest_transitive_path):
+                    self.assertSameDiff(older, newer, include_shortest_transitive_path=include_shortest_transitive_path)
+
+    def test_random_cyclic_graphs(self):
+        rng = random.Random(33)
+        for i in range(100):
+            newer = random_graph(rng, 12, 20)
+            older = newer.copy()
+            older.remove_edges_from(rng.sample(list(older.edges), min(4, len(older.edges))))
+            older.add_edges_from(random_graph(rng, 12, 3).edges)
+            with self.subTest(i=i):
+                self.assertSameDiff(older, newer)
+
+
+class TestCompareGraphFocus(TestCase):
+
+    def test_whole_graph_in_focus_is_unchanged(self):
+        for name, older, newer in fixture_graphs():
+            with self.subTest(name=name):
+                focus = list(older.nodes) + list(newer.nodes)
+                self.assertEqual(as_data(compare_graph(older, newer, parent_function=gradle_split)),
+                                 as_data(compare_graph(older, newer, parent_function=gradle_split, focus=focus)))
+
+    def test_only_neighbourhood_is_compared(self):
+        older = load_graph_from_deps_lines(["a -> b -> c -> d\n"])
+        newer = load_graph_from_deps_lines(["a -> b -> c -> d\n", "a -> x\n", "d -> y\n"])
+        diff = compare_graph(older, newer, focus=["a"], hops=1)
+        self.assertEqual([("a", "x")], list(diff.edges))
+
+    def test_indirect_edge_through_nodes_outside_neighbourhood(self):
+        older = load_graph_from_deps_lines(["f -> o1 -> o2 -> o3 -> t\n"])
+        newer = load_graph_from_deps_lines(["f -> o1 -> o2 -> o3 -> t\n", "f -> n\n", "t -> u\n"])
+        diff = compare_graph(older, newer, focus=["f", "t"], hops=1)
+        self.assertEqual({"indirect": True, "indirect_distance": 4}, diff.edges["f", "t"])
+        self.assertNotIn("o2", diff.nodes)
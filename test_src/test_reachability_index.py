@@ -0,0 +1,62 @@
+import os
+import random
+import tempfile
+from unittest import TestCase, mock
+
+from diff_dot.api import diff_files
+from diff_dot.gradle import gradle_split
+from diff_dot.graph_diff import compare_graph, reachability
+from diff_dot.graph_file import load_graph
+from diff_dot.reachability_index import ReachabilityIndex, write_index, build_index_for, load_index_for
+from test_src.test_graph_diff import random_graph, fixture_graphs, as_data
+
+
+class TestReachabilityIndex(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.directory.name, "graph.reach")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        rng = random.Random(34)
+        for node_count, edge_count in [(0, 0), (1, 0), (5, 3), (40, 90)]:
+            graph = random_graph(rng, node_count, edge_count)
+            write_index(graph, self.index_file)
+            expected = {u: {v: d for v, d in row.items() if d} for u, row in reachability(graph).items()}
+            with ReachabilityIndex(self.index_file) as index:
+                self.assertEqual(expected, {u: index[u] for u in index})
+
+    def test_compare_graph_with_index(self):
+        for name, older, newer in fixture_graphs():
+            write_index(newer, self.index_file)
+            with self.subTest(name=name), ReachabilityIndex(self.index_file) as index:
+                self.assertEqual(as_data(compare_graph(older, newer, parent_function=gradle_split)),
+                                 as_data(compare_graph(older, newer, parent_function=gradle_split,
+                                                       newer_reachability=index)))
+
+    def test_stale_index_is_ignored(self):
+        deps_file = os.path.join(self.directory.name, "graph.deps")
+        with open(deps_file, "w") as file:
+            file.write("a -> b\n")
+        build_index_for(deps_file, load_graph(deps_file))
+        index = load_index_for(deps_file)
+        self.assertEqual({"b": 1}, index["a"])
+        index.close()
+        with open(deps_file, "a") as file:
+            file.write("b -> c\n")
+        self.assertIsNone(load_index_for(deps_file))
+
+    def test_diff_files_uses_and_closes_newer_index(self):
+        older_file = os.path.join(self.directory.name, "older.deps")
+        newer_file = os.path.join(self.directory.name, "newer.deps")
+        for path, content in [(older_file, "a -> b\n"), (newer_file, "a -> b -> c\n")]:
+            with open(path, "w") as file:
+                file.write(content)
+        expected = as_data(diff_files(older_file, newer_file, self.directory.name))
+        build_index_for(newer_file, load_graph(newer_file))
+        with mock.patch.object(ReachabilityIndex, "close", autospec=True, side_effect=ReachabilityIndex.close) as close:
+            self.assertEqual(expected, as_data(diff_files(older_file, newer_file, self.directory.name)))
+        close.assert_called_once()
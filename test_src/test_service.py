@@ -0,0 +1,125 @@
+import os
+import socket
+import tempfile
+import threading
+from unittest import TestCase
+
+from diff_dot.error import CommandError
+from diff_dot.service import GraphCache, DiffService, request_diff, serve
+
+
+class TestService(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.older = self._write("older.deps", "a -> b\n")
+        self.newer = self._write("newer.deps", "a -> b\nb -> c\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_cache_reuses_parsed_graph_for_same_content(self):
+        cache = GraphCache()
+        first = cache.get(self.newer)
+        second = cache.get(self._write("copy.deps", "a -> b\nb -> c\n"))
+        self.assertIs(first, second)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = GraphCache(max_size=1)
+        cache.get(self.older)
+        cache.get(self.newer)
+        cache.get(self.older)
+        self.assertEqual((0, 3), (cache.hits, cache.misses))
+        self.assertEqual(1, len(cache))
+
+    def test_diff(self):
+        response = DiffService().diff({"older": self.older, "newer": self.newer})
+        self.assertFalse(response["empty"])
+        self.assertIn('tooltip="b\\n   ->\\nc"', response["dot"])
+
+    def test_diff_jsonl(self):
+        response = DiffService().diff({"older": self.older, "newer": self.newer, "format": "jsonl"})
+        self.assertFalse(response["empty"])
+        self.assertIn('{"type":"edge","from":"b","to":"c","state":"new"', response["jsonl"])
+
+    def test_why(self):
+        service = DiffService()
+        response = service.why({"older": self.older, "newer": self.newer, "source": "a", "target": "c"})
+        self.assertEqual([["a", "b", "c"]], response["paths"])
+        self.assertEqual([{"from": "b", "to": "c", "distance": 2}], response["new_edges"])
+        self.assertIs(service.cache.get(self.newer).paths, service.cache.get(self.newer).paths)
+
+    def test_why_limit_validated(self):
+        for limit in ["2", -1, 1.5, True]:
+            with self.subTest(limit=limit), self.assertRaises(ValueError):
+                DiffService().why({"newer": self.newer, "source": "a", "target": "c", "limit": limit})
+
+    def test_diff_focus(self):
+        newer = self._write("focus.deps", "a -> b\nb -> c\nx -> y\n")
+        response = DiffService().diff({"older": self.older, "newer": newer, "focus": ["x"], "format": "jsonl"})
+        self.assertIn('"from":"x","to":"y"', response["jsonl"])
+        self.assertNotIn('"to":"c"', response["jsonl"])
+        with self.assertRaises(ValueError):
+            DiffService().diff({"older": self.older, "newer": newer, "focus": "x"})
+
+    def test_diff_report_directory(self):
+        os.makedirs(os.path.join(self.directory.name, "reports"))
+        self._write("reports/app.txt", "Project ':app'\n\nreleaseRuntimeClasspath\n\\--- project :a\n")
+        self._write("reports/a.txt", "Project ':a'\n\nreleaseRuntimeClasspath\n\\--- project :b\n")
+        older = self._write("reports.deps", ":app -> :a\n")
+        service = DiffService()
+        response = service.diff({"older": older, "newer": os.path.join(self.directory.name, "reports"),
+                                 "format": "jsonl"})
+        self.assertIn('"from":":a","to":":b","state":"new"', response["jsonl"])
+        service.diff({"older": older, "newer": os.path.join(self.directory.name, "reports")})
+        self.assertEqual((2, 2), (service.cache.hits, service.cache.misses))
+
+    def test_diff_no_changes(self):
+        self.assertEqual({"empty": True}, DiffService().diff({"older": self.older, "newer": self.older}))
+
+    def test_request_through_server(self):
+        server = serve(port=0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            host, port = server.server_address
+            response = request_diff({"older": self.older, "newer": self.newer}, server=f"http://{host}:{port}")
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.assertEqual(DiffService().diff({"older": self.older, "newer": self.newer}), response)
+
+    def test_request_falls_back_to_in_process(self):
+        response = request_diff({"older": self.older, "newer": self.newer}, server="http://127.0.0.1:1")
+        self.assertFalse(response["empty"])
+
+    def test_request_falls_back_when_server_times_out(self):
+        with socket.socket() as listening:
+            listening.bind(("127.0.0.1", 0))
+            listening.listen()
+            host, port = listening.getsockname()
+            response = request_diff({"older": self.older, "newer": self.newer}, server=f"http://{host}:{port}",
+                                    timeout=0.1)
+        self.assertFalse(response["empty"])
+
+    def test_request_reports_server_error(self):
+        server = serve(port=0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            host, port = server.server_address
+            with self.assertRaisesRegex(CommandError, "missing.deps"):
+                request_diff({"older": self.older, "newer": os.path.join(self.directory.name, "missing.deps")},
+                             server=f"http://{host}:{port}")
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
@@ -0,0 +1,42 @@
+import os
+
+from diff_dot.commit_graphs import CommitGraphCache
+from diff_dot.error import CommandError
+from diff_dot.timeline import timeline, timeline_summary
+from test_src.fake_gradle import FakeGradleRepoTestCase, REPORT
+
+
+class TestTimeline(FakeGradleRepoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.commits = []
+        for i, dependencies in enumerate([[":lib-a"], None, [":lib-a", ":lib-b"], None, [":lib-a", ":lib-b"],
+                                          [":lib-c"]]):
+            if dependencies is None:
+                self._write("src.txt", f"{i}")
+            else:
+                self._write("build.gradle", f"{i}")
+                self._write("dependencies.txt", REPORT.format("\n".join(f"+--- project {d}" for d in dependencies)))
+            self.repo.index.add(["gradlew", "build.gradle", "dependencies.txt"] + (["src.txt"] if i else []))
+            self.commits.append(self.repo.index.commit(f"commit {i}").hexsha)
+        self.options = dict(worktree_dir=self.directory.name, parallel=2,
+                            cache=CommitGraphCache(os.path.join(self.directory.name, "cache")))
+
+    def test_steps_over_commits_changing_build_inputs(self):
+        steps = timeline(self.repo, self.commits[0], self.commits[5], **self.options)
+        self.assertEqual([(self.commits[0], self.commits[2]), (self.commits[2], self.commits[4]),
+                          (self.commits[4], self.commits[5])],
+                         [(step.older, step.newer) for step in steps])
+        self.assertEqual(4, self._gradle_runs())
+
+    def test_summary(self):
+        summary = timeline_summary(timeline(self.repo, self.commits[0], self.commits[5], **self.options))
+        self.assertEqual(2, summary["changed_steps"])
+        self.assertEqual([(1, 0), (0, 0), (1, 2)],
+                         [(step["added_edges"], step["removed_edges"]) for step in summary["steps"]])
+        self.assertEqual(dict(added_nodes=2, removed_nodes=2, added_edges=2, removed_edges=2), summary["totals"])
+
+    def test_empty_range(self):
+        with self.assertRaises(CommandError):
+            timeline(self.repo, self.commits[3], self.commits[3], **self.options)
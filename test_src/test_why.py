@@ -0,0 +1,78 @@
+import random
+from unittest import TestCase
+
+import networkx as nx
+
+from diff_dot.graph_file import load_graph_from_deps_lines
+from diff_dot.why import PathIndex, why
+from test_src.test_graph_diff import random_graph
+
+
+class TestPathIndex(TestCase):
+
+    def setUp(self):
+        self.index = PathIndex(load_graph_from_deps_lines(["a -> b -> d -> e\n", "a -> c -> d\n", "e -> a\n", "f\n"]))
+
+    def test_shortest_paths(self):
+        self.assertEqual(3, self.index.distance("a", "e"))
+        self.assertEqual([["a", "b", "d", "e"], ["a", "c", "d", "e"]], list(self.index.shortest_paths("a", "e")))
+        self.assertEqual([["e", "a", "b"]], list(self.index.shortest_paths("e", "b")))
+
+    def test_unreachable(self):
+        self.assertIsNone(self.index.distance("a", "f"))
+        self.assertIsNone(self.index.distance("x", "a"))
+        self.assertEqual([], list(self.index.shortest_paths("a", "f")))
+        self.assertEqual({}, self.index.edges_on_paths("a", "f"))
+
+    def test_edges_on_paths(self):
+        self.assertEqual({("a", "b"): 2, ("a", "c"): 2, ("b", "d"): 2, ("c", "d"): 2},
+                         self.index.edges_on_paths("a", "d"))
+        self.assertEqual({("e", "a"): 3, ("a", "b"): 3, ("a", "c"): 3, ("b", "d"): 3, ("c", "d"): 3},
+                         self.index.edges_on_paths("e", "d"))
+
+    def test_searches_are_kept(self):
+        self.index.shortest_paths("a", "e")
+        search = self.index._search_from("a")
+        list(self.index.shortest_paths("a", "d"))
+        self.assertIs(search, self.index._search_from("a"))
+
+    def test_least_recently_used_searches_dropped(self):
+        index = PathIndex(self.index.graph, max_searches=2)
+        searches = [index._search_from(node) for node in ["a", "b", "a", "c"]]
+        self.assertEqual(["a", "c"], list(index._from))
+        self.assertIs(searches[0], index._search_from("a"))
+        self.assertIsNot(searches[1], index._search_from("b"))
+
+    def test_matches_networkx(self):
+        rng = random.Random(35)
+        for i in range(30):
+            graph = random_graph(rng, 15, 35)
+            index = PathIndex(graph)
+            for source, target in [(rng.choice(list(graph)), rng.choice(list(graph))) for _ in range(10)]:
+                if source == target:
+                    continue
+                with self.subTest(i=i, source=source, target=target):
+                    if nx.has_path(graph, source, target):
+                        self.assertEqual(sorted(nx.all_shortest_paths(graph, source, target)),
+                                         sorted(index.shortest_paths(source, target)))
+                    else:
+                        self.assertIsNone(index.distance(source, target))
+
+
+class TestWhy(TestCase):
+
+    def test_new_edges(self):
+        older = PathIndex(load_graph_from_deps_lines([":app -> :a -> :b\n", ":c -> :x\n"]))
+        newer = PathIndex(load_graph_from_deps_lines([":app -> :a -> :b\n", ":a -> :c -> :x\n", ":b -> :x\n"]))
+        answer = why(newer, ":app", ":x", older=older)
+        self.assertEqual(3, answer["distance"])
+        self.assertIsNone(answer["older_distance"])
+        self.assertEqual([[":app", ":a", ":b", ":x"], [":app", ":a", ":c", ":x"]], answer["paths"])
+        self.assertEqual([{"from": ":a", "to": ":c", "distance": 3}, {"from": ":b", "to": ":x", "distance": 3}],
+                         answer["new_edges"])
+
+    def test_limit(self):
+        index = PathIndex(load_graph_from_deps_lines([f"a -> {i} -> b\n" for i in range(5)]))
+        answer = why(index, "a", "b", limit=2)
+        self.assertEqual((2, 3), (len(answer["paths"]), answer["path_count"]))
+        self.assertNotIn("new_edges", answer)